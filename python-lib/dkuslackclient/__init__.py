@@ -1,4 +1,8 @@
 from .slack_manager import SlackManager
 from .slack_event_handler import SlackEventHandler
 from .dku_slack_client import DKUSlackClient 
-from .message_formatter import MessageFormatter
\ No newline at end of file
+from .message_formatter import MessageFormatter
+from .message_batcher import MessageBatcher
+from .rate_limiter import TokenBucket
+from .response_cache import ResponseCache
+from .request_verification import KeyedSignatureVerifier, KeyedRequestVerification
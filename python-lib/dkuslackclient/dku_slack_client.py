@@ -3,7 +3,6 @@ import re
 from utils.logging import logger
 from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.errors import SlackApiError
-from slack_sdk.signature import SignatureVerifier
 
 from cachetools import TTLCache
 from datetime import datetime
@@ -22,6 +21,8 @@ class DKUSlackClient():
     USER_FETCH_LIMIT = 100  # Maximum number of users to fetch per API call
     CACHE_TTL = 86400  # 24 hours in seconds
     CACHE_MAXSIZE = math.inf  # Maximum number of items in cache
+    USER_MISS_CACHE_TTL = 300  # Seconds a failed user lookup is remembered before retrying
+    USER_MISS_CACHE_MAXSIZE = 1024  # Maximum number of failed user lookups remembered
     
     # Slack API rate limit tiers
     # https://api.slack.com/apis/rate-limits
@@ -44,10 +45,14 @@ class DKUSlackClient():
         self._is_bot_token = False
         self._bot_user_id = None
         self._bot_user_name = None
+        self._auth_info = None
         self.signature_verifier = None
         self._slack_async_web_client = None
         self._bot_prefix = None
         self._slack_user_cache = TTLCache(maxsize=self.CACHE_MAXSIZE, ttl=self.CACHE_TTL)
+        # User IDs whose lookup failed recently (e.g. missing users:read scope), so every
+        # message from them doesn't call users.info again
+        self._slack_user_miss_cache = TTLCache(maxsize=self.USER_MISS_CACHE_MAXSIZE, ttl=self.USER_MISS_CACHE_TTL)
         self._slack_channel_name_cache = TTLCache(maxsize=self.CACHE_MAXSIZE, ttl=self.CACHE_TTL)
         self._slack_channel_members_cache = TTLCache(maxsize=self.CACHE_MAXSIZE, ttl=self.CACHE_TTL)
         
@@ -71,6 +76,8 @@ class DKUSlackClient():
             if not response["ok"]:
                 logger.error("Token test failed: %s", response.get("error"))
                 raise ValueError(f"Token test failed: {response.get('error')}")
+            # Kept so the bot identity can be read without calling auth.test again
+            self._auth_info = dict(response.data)
             
             # Log authentication information
             logger.info("Token test successful")
@@ -123,6 +130,11 @@ class DKUSlackClient():
         """Get the bot user name."""
         return self._bot_user_name
 
+    @property
+    def auth_info(self):
+        """Get the auth.test response for the token (user_id, user, team_id, ...)."""
+        return self._auth_info
+
     def _cache_user_info(self, user_id, user_info):
         """
         Process and cache user information.
@@ -132,8 +144,9 @@ class DKUSlackClient():
         :return: Tuple containing (user_id, display_name, email)
         """
         username = user_info.get("real_name", "Unknown User")
-        display_name = user_info.get("profile", {}).get("display_name", username)
-        email = user_info.get("profile", {}).get("email", "No email found")
+        profile = user_info.get("profile") or {}
+        display_name = profile.get("display_name", username)
+        email = profile.get("email", "No email found")
 
         # Cache the complete user info
         self._slack_user_cache[user_id] = {
@@ -192,15 +205,18 @@ class DKUSlackClient():
         :param user_id: Slack user ID to fetch information for
         :return: Tuple containing (user_id, display_name, email) or (None, None, None) if not found
         """
-        logger.info(f"Getting user by ID {user_id}")
+        logger.info("Getting user by ID %s", user_id)
         # Check cache first
         cached_user = self._slack_user_cache.get(user_id)
         if cached_user:
-            logger.debug(f"Using cached user info for {cached_user['name']} ({cached_user['email']})")
+            logger.debug("Using cached user info for %s (%s)", cached_user['name'], cached_user['email'])
             return user_id, cached_user["name"], cached_user["email"]
+        if user_id in self._slack_user_miss_cache:
+            logger.debug("User %s lookup failed recently, skipping Slack API call", user_id)
+            return None, None, None
         
         # If not in cache, get user info
-        logger.debug(f"Cached user info was not found for user {user_id}, fetching from Slack API")
+        logger.debug("Cached user info was not found for user %s, fetching from Slack API", user_id)
         async with self._tier_4_semaphore:  # users_info is Tier 4 (100+ per minute)
             response = await self._handle_rate_limit(
                 self._slack_async_web_client.users_info,
@@ -210,6 +226,7 @@ class DKUSlackClient():
             )
             if response:
                 return self._cache_user_info(user_id, response["user"])
+            self._slack_user_miss_cache[user_id] = True
             return None, None, None
 
     async def _get_user_by_email(self, email):
@@ -735,13 +752,14 @@ class DKUSlackClient():
         logger.info(f"Successfully fetched {len(all_messages)} messages from {len(channels)} channels")
         return all_messages
 
-    async def fetch_thread_replies(self, channel_id, thread_ts, resolve_users=True):
+    async def fetch_thread_replies(self, channel_id, thread_ts, resolve_users=True, oldest=None):
         """
         Fetch replies for a specific thread using conversations.replies.
         
         :param channel_id: ID of the channel containing the thread
         :param thread_ts: Timestamp of the parent message
         :param resolve_users: Whether to resolve user IDs to usernames and emails (default: True)
+        :param oldest: Only fetch replies posted after this timestamp (optional)
         :return: Tuple of (replies, error) where error is None if successful, or error message if failed
         """
         logger.info(f"Fetching replies for thread {thread_ts} in channel {channel_id}")
@@ -751,6 +769,7 @@ class DKUSlackClient():
                 self._slack_async_web_client.conversations_replies,
                 channel=channel_id,
                 ts=thread_ts,
+                oldest=oldest,  # Dropped by slack_sdk when None
                 error_handler=lambda e: {"ok": False, "error": str(e), "messages": []},  # Return error info
                 log_prefix=f"Fetch thread {thread_ts} replies: "
             )
@@ -760,8 +779,8 @@ class DKUSlackClient():
                 logger.error(error_msg)
                 return [], error_msg
             
-            # Skip the first message as it's the parent message
-            replies = response["messages"][1:] if len(response["messages"]) > 1 else []
+            # Skip the parent message, which Slack returns first even when oldest is set
+            replies = [message for message in response["messages"] if message.get("ts") != thread_ts]
             
             # Add user information to all replies if requested
             if resolve_users:
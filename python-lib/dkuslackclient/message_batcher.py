@@ -0,0 +1,88 @@
+import threading
+from utils.logging import logger
+
+
+class MessageBatcher:
+    """
+    Coalesces messages that arrive in quick succession from the same user in the
+    same conversation, so that a burst of messages is answered with a single response.
+    The batch windows are timed on an asyncio event loop, so no thread is started per batch.
+    """
+
+    # Constants
+    DEFAULT_WINDOW_SECONDS = 0.15  # How long to wait for follow-up messages before flushing
+    DEFAULT_MAX_BATCH_SIZE = 10  # Flush immediately once this many messages are buffered
+
+    def __init__(self, flush_callback, get_loop, window_seconds=None, max_batch_size=None):
+        """
+        Initialize the MessageBatcher.
+
+        Args:
+            flush_callback: Called as flush_callback(events, say, client) with the buffered
+                            events (oldest first) when a batch is flushed. Called from the loop's
+                            thread when the window ends, so it must not block
+            get_loop: Returns the running event loop timing the batch windows
+            window_seconds: Time to wait after the first message of a batch (default: DEFAULT_WINDOW_SECONDS)
+            max_batch_size: Maximum number of messages per batch (default: DEFAULT_MAX_BATCH_SIZE)
+        """
+        self._flush_callback = flush_callback
+        self._get_loop = get_loop
+        self.window_seconds = window_seconds if window_seconds is not None else self.DEFAULT_WINDOW_SECONDS
+        self.max_batch_size = max_batch_size if max_batch_size is not None else self.DEFAULT_MAX_BATCH_SIZE
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    @staticmethod
+    def batch_key(event_data):
+        """
+        Get the key grouping messages into the same batch.
+
+        Args:
+            event_data: The message event data from Slack
+
+        Returns:
+            tuple: (channel, thread_ts or "none", user_id)
+        """
+        return (
+            event_data.get("channel"),
+            event_data.get("thread_ts") or "none",
+            event_data.get("user")
+        )
+
+    def submit(self, event_data, say, client):
+        """
+        Buffer a message event, starting the batch window if it is the first one for its key.
+
+        Args:
+            event_data: The message event data from Slack
+            say: Function to send a message
+            client: Slack WebClient for API calls
+        """
+        key = self.batch_key(event_data)
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = {"events": [], "say": say, "client": client}
+                self._pending[key] = batch
+                loop = self._get_loop()
+                loop.call_soon_threadsafe(loop.call_later, self.window_seconds, self._flush, key, batch)
+            batch["events"].append(event_data)
+            is_full = len(batch["events"]) >= self.max_batch_size
+
+        logger.debug("Buffered message for batch %s (%s pending)", key, len(batch['events']))
+        if is_full:
+            self._flush(key, batch)
+
+    def _flush(self, key, batch):
+        """Hand the buffered events of a batch over to the flush callback."""
+        with self._lock:
+            # The batch was already flushed when it filled up before its window ended
+            if self._pending.get(key) is not batch:
+                return
+            del self._pending[key]
+
+        logger.debug("Flushing batch %s with %s messages", key, len(batch['events']))
+        try:
+            self._flush_callback(batch["events"], batch["say"], batch["client"])
+        except Exception as e:
+            logger.error("Error flushing message batch: %s", e, exc_info=True)
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket pacing calls to a rate limited API.
+    Waiting for a token happens on the event loop, so no thread is held while paced.
+    Allows short bursts up to the bucket capacity, then one call per refill interval.
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            rate: Number of tokens added back to the bucket per second
+            capacity: Maximum number of tokens in the bucket, i.e. the allowed burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add the tokens earned since the last update. Must be called with the lock held."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self):
+        """
+        Take a token from the bucket if one is available, without waiting.
+
+        Returns:
+            bool: True if a token was taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    async def acquire(self):
+        """
+        Take a token from the bucket, waiting on the event loop until one is available.
+
+        Returns:
+            float: The number of seconds spent waiting for the token
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+            waited += wait
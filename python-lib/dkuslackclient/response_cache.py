@@ -0,0 +1,135 @@
+import threading
+from cachetools import TTLCache
+from utils.logging import logger
+
+
+class ResponseCache:
+    """
+    Caches LLM answers to standalone questions so repeated questions skip the LLM.
+    Questions are first matched exactly (ignoring case and whitespace). When an
+    embedding LLM is provided, paraphrased questions whose embedding is close enough
+    to a cached question are matched as well. Answers are only matched within the
+    scope they were cached in, e.g. the user whose profile shaped the answer.
+    """
+
+    # Constants
+    DEFAULT_MAXSIZE = 256  # Maximum number of cached answers
+    DEFAULT_TTL = 3600  # Seconds an answer is kept
+    DEFAULT_SIMILARITY_THRESHOLD = 0.9  # Minimum cosine similarity for a semantic match
+    PENDING_EMBEDDINGS_TTL = 300  # Seconds a lookup embedding is kept for the following put()
+
+    def __init__(self, maxsize=None, ttl=None, embedding_llm=None, similarity_threshold=None):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            maxsize: Maximum number of cached answers (default: DEFAULT_MAXSIZE)
+            ttl: Seconds an answer is kept (default: DEFAULT_TTL)
+            embedding_llm: Dataiku embedding LLM used for semantic matching (optional,
+                           only exact matches are served without it)
+            similarity_threshold: Minimum cosine similarity for a semantic match
+                                  (default: DEFAULT_SIMILARITY_THRESHOLD)
+        """
+        maxsize = maxsize or self.DEFAULT_MAXSIZE
+        ttl = ttl or self.DEFAULT_TTL
+        self.similarity_threshold = similarity_threshold or self.DEFAULT_SIMILARITY_THRESHOLD
+        self._embedding_llm = embedding_llm
+        self._answers = TTLCache(maxsize=maxsize, ttl=ttl)  # (scope, question) -> answer
+        self._embeddings = TTLCache(maxsize=maxsize, ttl=ttl)  # (scope, question) -> normalized embedding
+        # Embeddings computed by get() on a miss, reused by the put() that follows
+        self._pending_embeddings = TTLCache(maxsize=maxsize, ttl=self.PENDING_EMBEDDINGS_TTL)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text):
+        """Normalize a question so trivially different spellings share a cache entry."""
+        return " ".join(text.lower().split())
+
+    def get(self, text, scope=None):
+        """
+        Get the cached answer to a question. Blocking when semantic matching is enabled.
+
+        Args:
+            text: The question
+            scope: Only match answers cached with this scope (optional, None is shared)
+
+        Returns:
+            str: The cached answer, or None on a miss
+        """
+        key = (scope, self.normalize(text))
+        with self._lock:
+            answer = self._answers.get(key)
+        if answer is not None or self._embedding_llm is None:
+            return answer
+
+        embedding = self._embed(key[1])
+        if embedding is None:
+            return None
+
+        with self._lock:
+            self._pending_embeddings[key] = embedding
+            entries = [
+                (question, question_embedding)
+                for question, question_embedding in self._embeddings.items()
+                if question[0] == scope and question in self._answers
+            ]
+        if not entries:
+            return None
+
+        import numpy as np
+
+        scores = np.stack([question_embedding for _, question_embedding in entries]) @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        question = entries[best][0]
+        logger.debug("Semantic cache match (score %.3f) with question: %s", scores[best], question[1])
+        with self._lock:
+            return self._answers.get(question)
+
+    def put(self, text, answer, scope=None):
+        """
+        Cache the answer to a question. Blocking when semantic matching is enabled.
+
+        Args:
+            text: The question
+            answer: The LLM answer
+            scope: Scope the answer is only reused in (optional, None is shared)
+        """
+        key = (scope, self.normalize(text))
+        embedding = None
+        if self._embedding_llm is not None:
+            with self._lock:
+                embedding = self._pending_embeddings.pop(key, None)
+            if embedding is None:
+                embedding = self._embed(key[1])
+
+        with self._lock:
+            self._answers[key] = answer
+            if embedding is not None:
+                self._embeddings[key] = embedding
+
+    def _embed(self, text):
+        """
+        Get the unit-length embedding of a text.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            numpy.ndarray: The normalized embedding, or None if it could not be computed
+        """
+        # Only needed for semantic matching, which is off unless an embedding LLM is set
+        import numpy as np
+
+        try:
+            query = self._embedding_llm.new_embeddings()
+            query.add_text(text)
+            embedding = np.asarray(query.execute().get_embeddings()[0], dtype=np.float32)
+        except Exception as e:
+            logger.error("Error computing embedding for the response cache: %s", e)
+            return None
+
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else None
@@ -2,9 +2,164 @@ from utils.logging import logger
 import time
 import dataiku
 import asyncio
+import collections
+import concurrent.futures
+import functools
+import itertools
+import json
+import logging
 from markdown_it import MarkdownIt
 from markdown_it.tree import SyntaxTreeNode
 import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from cachetools import TTLCache
+from slack_sdk.errors import SlackApiError
+from .message_batcher import MessageBatcher
+from .rate_limiter import TokenBucket
+from .response_cache import ResponseCache
+
+# orjson parses RAG responses several times faster, use it when the code env has it
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# uvloop has lower per-callback overhead than the default loop, use it for the handler's
+# loop when the code env has it (the process-wide event loop policy is left untouched)
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
+
+
+# Marks lazily initialized attributes that haven't been initialized yet
+_NOT_INITIALIZED = object()
+
+# Text shaped like a JSON object, matched without copying a stripped version of it
+_JSON_OBJECT_PATTERN = re.compile(r"\s*\{.*\}\s*\Z", re.DOTALL)
+
+def _mrkdwn_section(text):
+    """Build a Block Kit section block holding mrkdwn text."""
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+def _context_block(text):
+    """Build a Block Kit context block holding a single mrkdwn element."""
+    return {"type": "context", "elements": [{"type": "mrkdwn", "text": text}]}
+
+
+def _image_block(image_url, alt_text):
+    """Build a Block Kit image block."""
+    return {"type": "image", "image_url": image_url, "alt_text": alt_text}
+
+
+def _retry_after_seconds(headers):
+    """Read the Retry-After header of a rate limited Slack response, whatever its casing (0 if absent)."""
+    for name, value in (headers or {}).items():
+        if name.lower() == "retry-after":
+            if isinstance(value, (list, tuple)):
+                value = value[0] if value else 0
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return 0
+    return 0
+
+
+@dataclass(slots=True)
+class ParsedEvent:
+    """The fields of a Slack message or mention event needed to answer it."""
+    user_id: Optional[str] = None
+    channel: Optional[str] = None
+    thread_ts: Optional[str] = None
+    text: str = ""
+    is_mention: bool = False
+    skip_reason: Optional[str] = None  # Why the event should be ignored, if it should
+
+
+@dataclass(slots=True)
+class ThreadHistory:
+    """The buffered history of a thread, extended with the replies posted since it was last fetched."""
+    messages: collections.deque  # (ts, LLM message) pairs, oldest first
+    last_ts: str  # Timestamp of the newest buffered reply, or of the thread itself
+
+
+# LLM names and types by LLM ID, shared by all handlers. Expires so renamed LLMs are picked up
+_LLM_META_CACHE = TTLCache(maxsize=128, ttl=600)
+_LLM_META_CACHE_LOCK = threading.Lock()
+
+
+def _fetch_llm_meta(llm_id):
+    """
+    Look up an LLM's name and type in the default project, shared by all handlers.
+    Failed lookups raise and are not cached.
+    
+    Args:
+        llm_id: The LLM ID
+        
+    Returns:
+        tuple: (llm_name, llm_type), with defaults if the LLM isn't listed
+    """
+    with _LLM_META_CACHE_LOCK:
+        meta = _LLM_META_CACHE.get(llm_id)
+    if meta is not None:
+        return meta
+    
+    meta = ("Unknown LLM", "UNKNOWN")
+    project = dataiku.api_client().get_default_project()
+    for llm in project.list_llms():
+        if llm.get('id') == llm_id:
+            meta = (llm.get('friendlyName', 'Unknown LLM'), llm.get('type', 'UNKNOWN'))
+            break
+    with _LLM_META_CACHE_LOCK:
+        _LLM_META_CACHE[llm_id] = meta
+    return meta
+
+
+def _format_source(number, src):
+    """Format a RAG source as a numbered Slack list item, linked when it has a URL."""
+    file = src.get("file", "Unknown source")
+    url = src.get("url", "")
+    if not url:
+        return f"{number}. {file}"
+    # ">" would end the Slack link early
+    if ">" in file:
+        file = file.replace(">", " - ")
+    return f"{number}. <{url}|{file}>"
+
+
+@dataclass(slots=True)
+class StreamedResponse:
+    """The full response of a streamed completion, shaped like a non-streamed LLM response."""
+    text: str
+    success: bool = True
+    errorMessage: Optional[str] = None
+    interrupted: bool = False  # The stream failed midway, text is what was received until then
+
+
+# Static leading blocks of the App Home view, shared by every handler (do not mutate)
+_HOME_PREFIX_BLOCKS = (
+    {
+        "type": "header",
+        "text": {"type": "plain_text", "text": "Welcome to Slack Integration!"},
+    },
+    _mrkdwn_section("This is a Slack integration for Dataiku DSS."),
+    _mrkdwn_section("*Available Tools:*"),
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _usage_block(bot_name):
+    """Build the App Home "How to Use" section for a bot name (shared, do not mutate)."""
+    return _mrkdwn_section(
+        "*How to Use:*\n• Send me a direct message\n"
+        f"• Mention me in a channel with @{bot_name or 'Bot'}"
+    )
+
 
 class SlackEventHandler:
     """
@@ -18,6 +173,7 @@ Hi there! You didn't provide a message with your mention.
 Mention me again in this thread so that I can help you out!
 """
     DEFAULT_LOADING_TEXT = "Thinking..."
+    ERROR_RESPONSE_TEXT = "I'm sorry, an error occurred while generating a response."
     DEFAULT_SYSTEM_PROMPT = """You are a versatile AI assistant. Your name is {bot_name}.
 Help users with writing, coding, task management, advice, project management, and any other needs.
 Provide concise, relevant assistance tailored to each request.
@@ -35,6 +191,50 @@ Respond using Slack markdown.
     DEFAULT_CONVERSATION_HISTORY_SECONDS = 2592000  # 30 days in seconds (1 month)
     DEFAULT_CONVERSATION_CONTEXT_LIMIT = 10  # Default number of messages to fetch
     
+    # Default window for coalescing bursts of messages (0 disables batching, the default)
+    DEFAULT_MESSAGE_BATCH_WINDOW_MS = 0
+    
+    # In-memory thread history buffers, so follow-up messages only fetch the newer replies
+    HISTORY_CACHE_MAXSIZE = 1024  # Maximum number of threads kept in memory
+    HISTORY_CACHE_TTL = 3600  # Seconds a thread buffer is kept after its last update
+    HISTORY_BUFFER_SIZE = 100  # Maximum number of messages kept per thread (max conversation_context_limit)
+    HOME_PUBLISHED_CACHE_MAXSIZE = 4096  # Maximum number of users whose published App Home is remembered
+    HOME_PUBLISHED_CACHE_TTL = 86400  # Seconds before the App Home is republished to a user anyway
+    
+    # Worker threads for blocking LLM completions and Slack API calls
+    IO_EXECUTOR_MAX_WORKERS = 24  # Room for the maximum LLM concurrency (16) plus Slack calls
+    DEFAULT_LLM_MAX_CONCURRENCY = 8  # Default number of LLM completions in flight at once
+    
+    # Streaming of LLM responses into the "Thinking..." message
+    DEFAULT_STREAM_RESPONSES = True
+    STREAM_UPDATE_INTERVAL_SECONDS = 3.0  # Minimum time between two partial updates of a message
+    # Budget of partial updates for all streamed answers, separate from the calls that must go out
+    STREAM_UPDATES_PER_MINUTE = 20
+    STREAM_UPDATE_BURST = 3
+    STREAM_INTERRUPTED_NOTE = "\n\n_(The response was interrupted by an error.)_"
+    
+    # Client-side pacing of the Slack API calls made to answer events, following Slack's limits:
+    # (calls per minute, burst) per method, and per channel for the methods in SLACK_API_PER_CHANNEL_METHODS
+    SLACK_API_LIMITS = {
+        "chat.postMessage": (60, 5),  # About one message per second per channel
+        "chat.update": (50, 5),  # Tier 3
+        "views.publish": (100, 20),  # Tier 4
+    }
+    SLACK_API_PER_CHANNEL_METHODS = frozenset({"chat.postMessage", "chat.update"})
+    SLACK_API_LIMITERS_MAXSIZE = 1024  # Maximum number of (method, channel) limiters kept
+    SLACK_API_LIMITERS_TTL = 600  # Seconds an unused limiter is kept (it is full again long before)
+    SLACK_API_MAX_RETRIES = 3  # Retries of a call rejected with HTTP 429
+    SLACK_API_BASE_BACKOFF_SECONDS = 1  # First backoff when Slack sends no Retry-After header
+    
+    # Fixed attribute layout: faster attribute access on the event path and no per-instance __dict__
+    __slots__ = (
+        "bot_id", "bot_name", "slack_client", "settings", "llm_id", "_llm_client",
+        "_mention_token", "_mention_pattern", "_tools", "_tool_blocks", "_system_prompt",
+        "_home_view", "_home_published", "_home_pending", "_home_published_lock", "_io_pool", "_loop", "_loop_thread", "_loop_lock",
+        "_llm_semaphore", "_message_batcher", "_slack_limiters", "_slack_limiters_lock", "_partial_update_limiter", "_history_cache",
+        "_llm_name", "_llm_type", "_llm_info_block", "_response_cache",
+    )
+    
     def __init__(self, bot_id=None, bot_name=None, slack_client=None, settings=None):
         """
         Initialize the SlackEventHandler.
@@ -51,67 +251,280 @@ Respond using Slack markdown.
         logger.debug("Initializing SlackEventHandler...")
         self.bot_id = bot_id
         self.bot_name = bot_name
+        # Mention token and pattern used to strip the bot mention from incoming text
+        self._mention_token = f"<@{bot_id}>" if bot_id else None
+        # The pattern also eats the whitespace after a mention so "a <@bot> b" becomes "a b"
+        self._mention_pattern = re.compile(rf"{re.escape(self._mention_token)}\s*") if self._mention_token else None
         self.slack_client = slack_client
         self.settings = settings or {}
         self.tools = []
         
-        # LLM info cache
+        # The system prompt only depends on the settings and bot name, so format it once
+        self._system_prompt = self._build_system_prompt()
+        
+        # View last published to each user's App Home, to skip republishing an identical view
+        self._home_published = TTLCache(maxsize=self.HOME_PUBLISHED_CACHE_MAXSIZE, ttl=self.HOME_PUBLISHED_CACHE_TTL)
+        # Users with a publish queued or in flight, so bursts of app_home_opened events
+        # for the same user result in a single views_publish call
+        self._home_pending = set()
+        self._home_published_lock = threading.Lock()
+        
+        # Single pool for every blocking call (LLM completions, say, chat_update, views_publish),
+        # also used as the event loop's default executor
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.IO_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="slack-io"
+        )
+        
+        # Long-lived event loop shared by all events, instead of one asyncio.run() per event.
+        # Started on first use, see _get_loop()
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        
+        # Cap concurrent LLM completions so bursts of events queue up instead of piling on
+        llm_max_concurrency = self.settings.get('llm_max_concurrency', self.DEFAULT_LLM_MAX_CONCURRENCY)
+        self._llm_semaphore = asyncio.Semaphore(llm_max_concurrency)
+        
+        # Coalesce rapid successive messages from the same user into one response
+        self._message_batcher = None
+        message_batch_window_ms = self.settings.get('message_batch_window_ms', self.DEFAULT_MESSAGE_BATCH_WINDOW_MS)
+        if message_batch_window_ms > 0:
+            self._message_batcher = MessageBatcher(
+                self._handle_batched_messages,
+                self._get_loop,
+                window_seconds=message_batch_window_ms / 1000
+            )
+        
+        # Limiters for the Slack API calls made by this handler, keyed by (method, channel or None)
+        self._slack_limiters = TTLCache(maxsize=self.SLACK_API_LIMITERS_MAXSIZE, ttl=self.SLACK_API_LIMITERS_TTL)
+        self._slack_limiters_lock = threading.Lock()
+        
+        # Partial updates are best effort, skipped when this limiter has no room
+        self._partial_update_limiter = TokenBucket(
+            rate=self.STREAM_UPDATES_PER_MINUTE / 60,
+            capacity=self.STREAM_UPDATE_BURST
+        )
+        
+        # Conversation history ring buffers, keyed by (channel, thread_ts)
+        self._history_cache = TTLCache(maxsize=self.HISTORY_CACHE_MAXSIZE, ttl=self.HISTORY_CACHE_TTL)
+        
+        # Last LLM info found, used when a later lookup fails
         self._llm_name = None
         self._llm_type = None
+        self._llm_info_block = None
         
         # Get LLM ID from settings
         self.llm_id = self.settings.get('llm_id')
         
-        # Initialize LLM client if llm_id is provided
-        self.llm_client = None
-        if self.llm_id:
+        # LLM client, initialized on first use (see the llm_client property)
+        self._llm_client = _NOT_INITIALIZED
+        
+        # Optional cache of answers to standalone questions
+        self._response_cache = None
+        if self.llm_id and self.settings.get('enable_response_cache'):
+            self._response_cache = self._create_response_cache()
+
+    @property
+    def llm_client(self):
+        """The Dataiku LLM client, initialized on first use (None if unavailable)."""
+        if self._llm_client is _NOT_INITIALIZED:
+            self._llm_client = self._create_llm_client()
+        return self._llm_client
+
+    @llm_client.setter
+    def llm_client(self, llm_client):
+        self._llm_client = llm_client
+
+    def _create_llm_client(self):
+        """
+        Create the LLM client if an LLM ID is configured.
+        
+        Returns:
+            The Dataiku LLM client, or None if no LLM is configured or it failed to initialize
+        """
+        if not self.llm_id:
+            return None
+        try:
+            logger.debug("Initializing LLM client with ID: %s", self.llm_id)
+            client = dataiku.api_client()
+            project = client.get_default_project()
+            llm_client = project.get_llm(self.llm_id)
+            logger.info("LLM client initialized for %s", self.llm_id)
+            return llm_client
+        except Exception as e:
+            logger.error("Failed to initialize LLM client: %s", e, exc_info=True)
+            return None
+
+    @property
+    def tools(self):
+        """The tools listed in the App Home view."""
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools):
+        """
+        Set the tools listed in the App Home view and rebuild their blocks.
+        Assign a new list rather than mutating it in place so the blocks stay in sync.
+        """
+        self._tools = tools
+        self._tool_blocks = [
+            _mrkdwn_section(f"• *{tool.name}*: {tool.description}")
+            for tool in tools
+        ]
+        # Rebuilt with the new tools on the next generate_home_view()
+        self._home_view = None
+
+    def _create_response_cache(self):
+        """
+        Create the response cache from the settings, with semantic matching
+        if an embedding LLM is configured.
+        
+        Returns:
+            ResponseCache: The response cache
+        """
+        embedding_llm = None
+        embedding_llm_id = self.settings.get('response_cache_embedding_llm_id')
+        if embedding_llm_id:
             try:
-                logger.debug(f"Initializing LLM client with ID: {self.llm_id}")
-                client = dataiku.api_client()
-                project = client.get_default_project()
-                self.llm_client = project.get_llm(self.llm_id)
-                logger.info(f"LLM client initialized for {self.llm_id}")
+                project = dataiku.api_client().get_default_project()
+                embedding_llm = project.get_llm(embedding_llm_id)
             except Exception as e:
-                logger.error(f"Failed to initialize LLM client: {str(e)}", exc_info=True)
-                self.llm_client = None
+                logger.error("Failed to initialize the response cache embedding LLM, only exact matches will be cached: %s", e)
+        
+        ttl_minutes = self.settings.get('response_cache_ttl_minutes')
+        logger.info("Response cache enabled (%s matching)", "semantic" if embedding_llm else "exact")
+        return ResponseCache(
+            ttl=ttl_minutes * 60 if ttl_minutes else None,
+            embedding_llm=embedding_llm,
+            similarity_threshold=self.settings.get('response_cache_similarity_threshold')
+        )
+
+    def _build_system_prompt(self):
+        """
+        Get the system prompt from the settings or use the default, formatted with the bot name.
+        
+        Returns:
+            str: The system prompt
+        """
+        use_custom_system_prompt = self.settings.get('use_custom_system_prompt', False)
+        logger.debug("the use_custom_system_prompt is %s", use_custom_system_prompt)
+        
+        if use_custom_system_prompt and self.settings.get('custom_system_prompt'):
+            system_prompt = self.settings.get('custom_system_prompt')
+        else:
+            system_prompt = self.DEFAULT_SYSTEM_PROMPT
+        
+        try:
+            return system_prompt.format(bot_name=self.bot_name)
+        except (KeyError, IndexError, ValueError) as e:
+            # Custom prompts may contain braces that aren't placeholders
+            logger.warn("Could not format the system prompt (%s), using it as is", e)
+            return system_prompt
+
+    def _get_loop(self):
+        """
+        Get the handler's event loop, starting it in a daemon thread on first use.
+        
+        Returns:
+            asyncio.AbstractEventLoop: The running event loop
+        """
+        loop = self._loop
+        if loop is not None:
+            return loop
+        
+        with self._loop_lock:
+            # Another event may have started it while we waited for the lock
+            if self._loop is None:
+                loop = _new_event_loop()
+                loop.set_default_executor(self._io_pool)
+                self._loop_thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="SlackEventHandlerLoop",
+                    daemon=True
+                )
+                self._loop_thread.start()
+                self._loop = loop
+                logger.debug("Started the event handler loop")
+            return self._loop
+
+    def _get_slack_limiter(self, method, channel=None):
+        """
+        Get the rate limiter of a Slack API method, for a channel if Slack limits the method per channel.
+        
+        Args:
+            method: The Slack API method name (e.g. chat.update)
+            channel: The channel ID the call targets (optional)
+            
+        Returns:
+            TokenBucket: The limiter
+        """
+        key = (method, channel if method in self.SLACK_API_PER_CHANNEL_METHODS else None)
+        with self._slack_limiters_lock:
+            limiter = self._slack_limiters.get(key)
+            if limiter is None:
+                calls_per_minute, burst = self.SLACK_API_LIMITS[method]
+                limiter = TokenBucket(rate=calls_per_minute / 60, capacity=burst)
+            # Re-insert to restart the TTL, so limiters in use are kept
+            self._slack_limiters[key] = limiter
+        return limiter
+
+    async def _call_slack_api(self, method, func, **kwargs):
+        """
+        Call a blocking Slack API method in the I/O pool once its rate limiter allows it,
+        retrying with exponential backoff when Slack answers with HTTP 429.
+        Waiting for the limiter and backing off happen on the event loop, so they hold no pool thread.
+        
+        Args:
+            method: The Slack API method name, selecting the rate limiter (e.g. chat.update)
+            func: The function calling the method (e.g. say or client.chat_update)
+            kwargs: Keyword arguments for the function
+            
+        Returns:
+            The method's response
+        """
+        loop = asyncio.get_running_loop()
+        limiter = self._get_slack_limiter(method, kwargs.get("channel"))
+        attempt = 0
+        while True:
+            waited = await limiter.acquire()
+            if waited:
+                logger.debug("Waited %.2f seconds for the Slack API rate limiter", waited)
+            try:
+                return await loop.run_in_executor(self._io_pool, functools.partial(func, **kwargs))
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt >= self.SLACK_API_MAX_RETRIES:
+                    raise
+                backoff = self.SLACK_API_BASE_BACKOFF_SECONDS * 2 ** attempt
+                retry_after = max(_retry_after_seconds(e.response.headers), backoff)
+                attempt += 1
+                logger.warn("Slack API rate limited. Retrying in %s seconds (attempt %s/%s)...", retry_after, attempt, self.SLACK_API_MAX_RETRIES)
+                await asyncio.sleep(retry_after)
 
     def get_llm_info(self):
         """
         Get LLM information (name and type) from Dataiku API.
-        Caches results for subsequent calls.
+        Lookups are cached for a few minutes by _fetch_llm_meta, so renamed LLMs are picked up.
         
         Returns:
             tuple: A tuple containing (llm_name, llm_type)
         """
-        # Return cached values if available
-        if self._llm_name is not None and self._llm_type is not None:
-            return self._llm_name, self._llm_type
-            
-        # Default values
-        llm_name = "Unknown LLM"
-        llm_type = "UNKNOWN"
+        if not self.llm_id:
+            return "Unknown LLM", "UNKNOWN"
         
         # Attempt to retrieve LLM info from Dataiku API
-        if self.llm_id:
-            try:
-                client = dataiku.api_client()
-                project = client.get_default_project()
-                llm_list = project.list_llms()
-                
-                for llm in llm_list:
-                    if llm.get('id') == self.llm_id:
-                        llm_name = llm.get('friendlyName', 'Unknown LLM')
-                        llm_type = llm.get('type', 'UNKNOWN')
-                        break
-                
-                logger.debug(f"Found LLM name for {self.llm_id}: {llm_name}, type: {llm_type}")
-            except Exception as e:
-                logger.error(f"Error getting LLM info: {str(e)}", exc_info=True)
+        try:
+            llm_name, llm_type = _fetch_llm_meta(self.llm_id)
+            logger.debug("Found LLM name for %s: %s, type: %s", self.llm_id, llm_name, llm_type)
+        except Exception as e:
+            logger.error("Error getting LLM info: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            # Keep using the last info found, if any
+            if self._llm_name is not None:
+                return self._llm_name, self._llm_type
+            return "Unknown LLM", "UNKNOWN"
         
-        # Cache the values
         self._llm_name = llm_name
         self._llm_type = llm_type
-        
         return llm_name, llm_type
 
     def convert_to_slack_markdown(self, markdown_text):
@@ -128,83 +541,76 @@ Respond using Slack markdown.
         tree = SyntaxTreeNode(md.parse(markdown_text))
         image_blocks = []
 
+        # Resolve the log level once instead of on every node
+        log_debug = logger.debug if logger.isEnabledFor(logging.DEBUG) else lambda *args: None
+
         def node_to_slack(node):
-            logger.debug(f"Processing node type: {node.type}")
+            log_debug("Processing node type: %s", node.type)
             
             if node.type == 'text':
-                logger.debug(f"Text node content: {node.content}")
+                log_debug("Text node content: %s", node.content)
                 return node.content
             elif node.type == 'strong':
                 content = ''.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"Strong node content: {content}")
+                log_debug("Strong node content: %s", content)
                 return f"*{content}*"
             elif node.type == 'em':
                 content = ''.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"Em node content: {content}")
+                log_debug("Em node content: %s", content)
                 return f"_{content}_"
             elif node.type == 's':
                 content = ''.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"Strikethrough node content: {content}")
+                log_debug("Strikethrough node content: %s", content)
                 return f"~{content}~"
             elif node.type == 'link':
                 href = node.attrs.get('href', '')
                 text = ''.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"Link node - href: {href}, text: {text}")
+                log_debug("Link node - href: %s, text: %s", href, text)
                 
                 # Check if the link is an image URL
                 image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
                 if any(href.lower().endswith(ext) for ext in image_extensions):
-                    image_block = {
-                        "type": "image",
-                        "image_url": href,
-                        "alt_text": text if text != href else "Image from message"
-                    }
-                    image_blocks.append(image_block)
+                    image_blocks.append(_image_block(href, text if text != href else "Image from message"))
                     return ""  # Return empty string as we'll handle the image separately
                 
                 return f"<{href}|{text}>"
             elif node.type == 'code_inline':
-                logger.debug(f"Code inline node content: {node.content}")
+                log_debug("Code inline node content: %s", node.content)
                 return f"`{node.content}`"
             elif node.type == 'code_block' or node.type == 'fence':
-                logger.debug(f"Code block/fence node content: {node.content}")
+                log_debug("Code block/fence node content: %s", node.content)
                 return f"```{node.content}```"
             elif node.type == 'blockquote':
                 lines = ''.join(node_to_slack(child) for child in node.children).splitlines()
-                logger.debug(f"Blockquote node lines: {lines}")
+                log_debug("Blockquote node lines: %s", lines)
                 return '\n'.join([f"> {line}" for line in lines])
             elif node.type == 'paragraph':
                 content = ''.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"Paragraph node content: {content}")
+                log_debug("Paragraph node content: %s", content)
                 return content + "\n"
             elif node.type == 'bullet_list':
                 content = '\n'.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"Bullet list node content: {content}")
+                log_debug("Bullet list node content: %s", content)
                 return content + "\n"
             elif node.type == 'list_item':
                 content = ''.join(node_to_slack(child) for child in node.children)
-                logger.debug(f"List item node content: {content}")
+                log_debug("List item node content: %s", content)
                 return f"- {content}"
             elif node.type == 'image':
                 src = node.attrs.get('src', '')
                 alt = node.attrs.get('alt', '')
-                logger.debug(f"Image node - src: {src}, alt: {alt}")
+                log_debug("Image node - src: %s, alt: %s", src, alt)
                 
                 # Create image block
-                image_block = {
-                    "type": "image",
-                    "image_url": src,
-                    "alt_text": alt if alt else "Image from message"
-                }
-                image_blocks.append(image_block)
+                image_blocks.append(_image_block(src, alt if alt else "Image from message"))
                 return ""  # Return empty string as we'll handle the image separately
             else:
                 content = ''.join(node_to_slack(child) for child in node.children or [])
-                logger.debug(f"Other node type '{node.type}' content: {content}")
+                log_debug("Other node type '%s' content: %s", node.type, content)
                 return content
 
         slack_text = ''.join(node_to_slack(child) for child in tree.children)
-        logger.debug(f"Final converted text: {slack_text}")
+        logger.debug("Final converted text: %s", slack_text)
         return slack_text.strip(), image_blocks
 
     def process_rag_response(self, response_text, text):
@@ -220,12 +626,11 @@ Respond using Slack markdown.
             where success is a boolean indicating if the response was processed as a RAG response
         """
         # Check if response looks like JSON
-        if not (response_text.strip().startswith("{") and response_text.strip().endswith("}")):
+        if not _JSON_OBJECT_PATTERN.match(response_text):
             return response_text, None, False
             
         try:
-            import json
-            parsed_response = json.loads(response_text)
+            parsed_response = _json_loads(response_text)
             
             # Check if the response has the expected RAG format
             if "result" not in parsed_response or "sources" not in parsed_response:
@@ -235,64 +640,39 @@ Respond using Slack markdown.
             result_text = parsed_response["result"]
             sources = parsed_response["sources"]
             
-            # Format sources as markdown links
-            source_items = []
-            for index, src in enumerate(sources):
-                file = src.get("file", "Unknown source")
-                url = src.get("url", "")
-                
-                if url:
-                    source_items.append(f"{index + 1}. <{url}|{file.replace('>', ' - ')}>")
-                else:
-                    source_items.append(f"{index + 1}. {file}")
-            
-            source_markdown = "\n".join(source_items)
+            # Format sources as a numbered list of markdown links
+            source_markdown = "\n".join(
+                _format_source(index, src) for index, src in enumerate(sources, start=1)
+            )
             
             # Create special blocks for RAG response with sources
             formatted_blocks = [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"_You asked: {text.replace('_', '')}_"
-                    }
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": result_text
-                    }
-                }
+                _mrkdwn_section(f"_You asked: {text.replace('_', '')}_"),
+                _mrkdwn_section(result_text)
             ]
             
             # Add sources section if there are sources
-            if source_items:
-                formatted_blocks.append(
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"*Sources:*\n{source_markdown}"
-                        }
-                    }
-                )
+            if source_markdown:
+                formatted_blocks.append(_mrkdwn_section(f"*Sources:*\n{source_markdown}"))
             
             return result_text, formatted_blocks, True
             
         except Exception as e:
-            logger.error(f"Error processing RAG response: {str(e)}", exc_info=True)
+            logger.error("Error processing RAG response: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return response_text, None, False
 
-    async def get_conversation_history(self, channel, thread_ts=None, conversation_context_limit=None, conversation_history_seconds=None):
+    async def get_conversation_history(self, channel, thread_ts=None, conversation_context_limit=None, conversation_history_seconds=None, before_ts=None):
         """
         Get conversation history from Slack using the SlackClient.
+        Thread histories are buffered in memory, so follow-up messages only fetch
+        the replies posted since the previous one.
         
         Args:
             channel: The channel ID
             thread_ts: The thread timestamp (optional)
             conversation_context_limit: Maximum number of messages to fetch (default: DEFAULT_CONVERSATION_CONTEXT_LIMIT)
             conversation_history_seconds: Maximum history period in seconds (default: DEFAULT_CONVERSATION_HISTORY_SECONDS)
+            before_ts: Only keep thread replies older than this timestamp (optional)
             
         Returns:
             list: The conversation history formatted for LLM
@@ -310,40 +690,68 @@ Respond using Slack markdown.
         
         try:
             if thread_ts:
-                # Fetch thread replies
+                key = (channel, thread_ts)
+                history = self._history_cache.get(key)
+                
+                # Fetch the thread replies, or only those posted since the buffer was last updated
                 replies, error = await self.slack_client.fetch_thread_replies(
                     channel_id=channel,
                     thread_ts=thread_ts,
-                    resolve_users=True
+                    resolve_users=True,
+                    oldest=history.last_ts if history is not None else None
                 )
                 
                 if error:
-                    logger.error(f"Error fetching thread replies: {error}")
+                    logger.error("Error fetching thread replies: %s", error)
                     return []
                 
-                # Convert to LLM-compatible format
-                conversation = []
-                for message in replies:
-                    # Skip messages from the bot itself
-                    if message.get("user") == self.bot_id:
-                        role = "assistant"
-                    else:
-                        role = "user"
-                    
-                    conversation.append({
-                        "role": role,
-                        "content": message.get("text", "")
-                    })
+                # Another event of the thread may have created or extended the buffer meanwhile
+                history = self._history_cache.get(key)
+                if history is None:
+                    history = ThreadHistory(collections.deque(maxlen=self.HISTORY_BUFFER_SIZE), last_ts=thread_ts)
+                
+                # Keep the replies that are newer than the buffer, skipping the message being
+                # answered and anything posted after it (buffered by a later fetch instead)
+                last = float(history.last_ts)
+                before = float(before_ts) if before_ts else None
+                new_replies = [
+                    message for message in replies
+                    if last < float(message.get("ts", 0)) and (before is None or float(message.get("ts", 0)) < before)
+                ]
                 
-                return conversation
+                # An answer still being generated will be edited, so only buffer the replies
+                # before it. It and the replies after it are fetched again next time
+                settled = next(
+                    (index for index, message in enumerate(new_replies) if self._is_pending_answer(message)),
+                    len(new_replies)
+                )
+                if settled:
+                    logger.debug("Buffering %s new replies for thread %s", settled, thread_ts)
+                    history.messages.extend(zip(
+                        (float(message["ts"]) for message in new_replies[:settled]),
+                        self._to_llm_messages(new_replies[:settled])
+                    ))
+                    history.last_ts = new_replies[settled - 1]["ts"]
+                # Re-insert to restart the TTL, so active threads stay buffered
+                self._history_cache[key] = history
+                
+                recent = self._recent_history(history.messages, conversation_context_limit, before)
+                if settled < len(new_replies):
+                    # Pass on the unbuffered replies too, except the placeholders of pending answers
+                    recent.extend(self._to_llm_messages(
+                        message for message in new_replies[settled:] if not self._is_pending_answer(message)
+                    ))
+                    recent = recent[-conversation_context_limit:]
+                return recent
             else:
                 # Get recent messages from channel
                 # Use current timestamp as end time
-                end_timestamp = str(time.time())
-                # Get messages from the specified history period
-                start_timestamp = str(time.time() - conversation_history_seconds)
+                now = time.time()
+                end_timestamp = f"{now:.6f}"
+                # Get messages from the specified history period, in Slack's fixed-point ts format
+                start_timestamp = f"{now - conversation_history_seconds:.6f}"
                 
-                logger.debug(f"Fetching messages from {start_timestamp} to {end_timestamp} with limit {conversation_context_limit}")
+                logger.debug("Fetching messages from %s to %s with limit %s", start_timestamp, end_timestamp, conversation_context_limit)
                 
                 messages = await self.slack_client.fetch_messages(
                     channel_id=channel,
@@ -352,28 +760,123 @@ Respond using Slack markdown.
                     total_limit=conversation_context_limit
                 )
                 
-                # Convert to LLM-compatible format
-                conversation = []
-                for message in messages:
-                    # Skip messages from the bot itself
-                    if message.get("user") == self.bot_id:
-                        role = "assistant"
-                    else:
-                        role = "user"
-                    
-                    conversation.append({
-                        "role": role,
-                        "content": message.get("text", "")
-                    })
-                
-                # Reverse to get chronological order
-                conversation.reverse()
-                return conversation
+                # Convert to LLM-compatible format, reversed to get chronological order
+                return self._to_llm_messages(reversed(messages))
                 
         except Exception as e:
-            logger.error(f"Error getting conversation history: {str(e)}", exc_info=True)
+            logger.error("Error getting conversation history: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return []
 
+    def _to_llm_messages(self, messages):
+        """
+        Convert Slack messages to LLM chat messages, attributing the bot's own
+        messages to the assistant.
+        
+        Args:
+            messages: Iterable of Slack messages, oldest first
+            
+        Returns:
+            list: The messages formatted for LLM
+        """
+        bot_id = self.bot_id
+        return [
+            {
+                "role": "assistant" if message.get("user") == bot_id else "user",
+                "content": message.get("text", "")
+            }
+            for message in messages
+        ]
+
+    def _is_pending_answer(self, message):
+        """
+        Check whether a Slack message is one of the bot's "Thinking..." messages
+        that the answer hasn't replaced yet, or is still being streamed into.
+        
+        Args:
+            message: The Slack message
+            
+        Returns:
+            bool: True if the message will still be updated
+        """
+        if message.get("user") != self.bot_id:
+            return False
+        loading_text = f"_{self.DEFAULT_LOADING_TEXT}_"
+        if message.get("text") == loading_text:
+            return True
+        # Partial updates keep the loading text in a trailing context block
+        return any(
+            block.get("type") == "context"
+            and any(element.get("text") == loading_text for element in block.get("elements", ()))
+            for block in message.get("blocks") or ()
+        )
+
+    def _forget_thread_history(self, message):
+        """
+        Drop the buffered history of the thread holding a message that a user edited
+        or deleted, so the next answer in the thread fetches it again.
+        
+        Args:
+            message: The message_changed or message_deleted event data from Slack
+        """
+        changed = message.get("message") or message.get("previous_message") or {}
+        thread_ts = changed.get("thread_ts")
+        # The bot's own edits are its answers replacing "Thinking...", which are never buffered early
+        if not thread_ts or changed.get("user") == self.bot_id or self._loop is None:
+            return
+        # The buffers are only touched from the handler's loop
+        self._loop.call_soon_threadsafe(self._history_cache.pop, (message.get("channel"), thread_ts), None)
+
+    def _strip_mention(self, text):
+        """
+        Remove the bot mention from a message text.
+        
+        Args:
+            text: The message text
+            
+        Returns:
+            str: The text without the bot mention and surrounding whitespace
+        """
+        if not self._mention_pattern:
+            return text.strip()
+        
+        # Mentions usually lead the text once, so try the cheap prefix strip first
+        if text.startswith(self._mention_token):
+            stripped = text[len(self._mention_token):]
+            if self._mention_token not in stripped:
+                return stripped.strip()
+        return self._mention_pattern.sub("", text).strip()
+
+    def _parse_event(self, event_data, is_mention=False):
+        """
+        Extract the fields needed to answer a message or mention event.
+        
+        Args:
+            event_data: The event data (message or mention)
+            is_mention: Whether this is a mention event
+            
+        Returns:
+            ParsedEvent: The parsed event, with skip_reason set if it should be ignored
+        """
+        # Skip messages from the bot itself
+        user_id = event_data.get("user")
+        if user_id == self.bot_id:
+            return ParsedEvent(user_id=user_id, is_mention=is_mention, skip_reason="bot itself")
+        
+        # Skip messages from any bot
+        bot_id = event_data.get("bot_id")
+        if bot_id is not None:
+            return ParsedEvent(user_id=user_id, is_mention=is_mention, skip_reason="another bot")
+        
+        return ParsedEvent(
+            user_id=user_id,
+            channel=event_data.get("channel"),
+            # Reply in the message's thread, or start one from the message
+            thread_ts=event_data.get("thread_ts") or event_data.get("ts"),
+            # Remove bot mention from text if present
+            text=self._strip_mention(event_data.get("text", "")),
+            is_mention=is_mention
+        )
+
     def handle_user_input(self, event_data, say, client, is_mention=False):
         """
         Common handler for both messages and mentions.
@@ -388,82 +891,130 @@ Respond using Slack markdown.
             None
         """
         event_type = "mention" if is_mention else "message"
-        logger.debug(f"Handling {event_type} event: {event_data}")
+        logger.debug("Handling %s event: %s", event_type, event_data)
         
-        # Skip messages from the bot itself
-        user_id = event_data.get("user")
-        if user_id == self.bot_id:
-            logger.debug(f"Skipping {event_type} from bot itself")
-            return
-            
-        # Skip messages from any bot
-        if event_data.get("bot_id") is not None:
-            logger.debug(f"Skipping {event_type} from another bot")
+        parsed = self._parse_event(event_data, is_mention)
+        if parsed.skip_reason:
+            logger.debug("Skipping %s from %s", event_type, parsed.skip_reason)
             return
         
-        # Get channel and thread info
-        channel = event_data.get("channel")
-        
-        # Check if the message is from a bot (not our bot)
-        is_from_bot = event_data.get("bot_id") is not None and event_data.get("bot_id") != self.bot_id
-        
-        # For bot messages, reply in the channel directly, not in a thread
-        thread_ts = None if is_from_bot else event_data.get("thread_ts", event_data.get("ts"))
-        
-        # Get the text of the message
-        text = event_data.get("text", "")
-        
-        # Remove bot mention from text if present
-        if self.bot_id:
-            text = text.replace(f"<@{self.bot_id}>", "").strip()
+        user_id = parsed.user_id
+        channel = parsed.channel
+        thread_ts = parsed.thread_ts
+        text = parsed.text
             
         # Handle case where user only mentioned the bot without text
         if is_mention and not text:
             logger.info("User mentioned bot without providing text")
-            say(
-                text=self.MENTION_WITHOUT_TEXT,
-                channel=channel,
-                thread_ts=thread_ts
+            future = asyncio.run_coroutine_threadsafe(
+                self._call_slack_api(
+                    "chat.postMessage",
+                    say,
+                    text=self.MENTION_WITHOUT_TEXT,
+                    channel=channel,
+                    thread_ts=thread_ts
+                ),
+                self._get_loop()
             )
+            future.add_done_callback(self._log_background_error)
             return
         
-        # Send "Thinking..." message
-        thinking_response = say(
+        # Process the input
+        logger.info("Processing %s from user %s", event_type, user_id)
+        logger.debug("Text: %s", text)
+        
+        # Answer on the handler's event loop so the Bolt worker thread is released right away
+        future = asyncio.run_coroutine_threadsafe(
+            self._handle_user_input_async(channel, thread_ts, text, event_data, say, client),
+            self._get_loop()
+        )
+        future.add_done_callback(self._log_background_error)
+
+    async def _async_say(self, say, **kwargs):
+        """
+        Send a message with the blocking say() function without blocking the event loop.
+        
+        Args:
+            say: Function to send a message
+            kwargs: Keyword arguments for say()
+            
+        Returns:
+            The say() response
+        """
+        return await self._call_slack_api("chat.postMessage", say, **kwargs)
+
+    @staticmethod
+    def _log_background_error(future):
+        """Log the failure of an event answered in the background."""
+        error = future.exception()
+        if error is not None:
+            logger.error("Error handling event: %s", error, exc_info=error if logger.isEnabledFor(logging.DEBUG) else None)
+
+    async def _handle_user_input_async(self, channel, thread_ts, text, event_data, say, client):
+        """
+        Post the "Thinking..." message while fetching the conversation history,
+        then generate the response and replace the "Thinking..." message with it.
+        
+        Args:
+            channel: The channel ID
+            thread_ts: The thread timestamp
+            text: The text to respond to
+            event_data: The original event data
+            say: Function to send a message
+            client: Slack WebClient for API calls
+        """
+        # Post the "Thinking..." message while the history is fetched
+        thinking_task = asyncio.create_task(self._call_slack_api(
+            "chat.postMessage",
+            say,
             text=f"_{self.DEFAULT_LOADING_TEXT}_",
             channel=channel,
             thread_ts=thread_ts
-        )
+        ))
+        if event_data.get("thread_ts"):
+            thinking_response, conversation = await asyncio.gather(
+                thinking_task,
+                self._fetch_conversation_history(channel, thread_ts, before_ts=event_data.get("ts"))
+            )
+        else:
+            # A top-level message starts a new thread, there is no history to fetch
+            thinking_response, conversation = await thinking_task, []
         
         # Get the timestamp of the "Thinking..." message
         thinking_ts = thinking_response.get("ts")
         
-        # Process the input
-        logger.info(f"Processing {event_type} from user {user_id}")
-        logger.debug(f"Text: {text}")
+        # Show the answer as it is generated, if enabled
+        on_partial = None
+        if thinking_ts and self.settings.get('stream_responses', self.DEFAULT_STREAM_RESPONSES):
+            on_partial = functools.partial(self._update_partial_response, client, channel, thinking_ts)
         
-        # Generate response using LLM
-        response = asyncio.run(self.generate_response(channel, thread_ts, text, event_data))
+        response = await self.generate_response(
+            channel, thread_ts, text, event_data, conversation=conversation, on_partial=on_partial
+        )
+        if not response:
+            return
         
-        if response:
-            try:
-                # Update the "Thinking..." message with the actual response
-                client.chat_update(
-                    channel=channel,
-                    ts=thinking_ts,
-                    text=response.get("text", ""),
-                    blocks=response.get("blocks", [])
-                )
-                logger.debug(f"Updated '{self.DEFAULT_LOADING_TEXT}' message with response in channel {channel}")
-                logger.debug(f"Response text: {response.get('text', '')}")
-                logger.debug(f"Response blocks: {response.get('blocks', [])}")
-            except Exception as e:
-                logger.error(f"Error updating message: {str(e)}", exc_info=True)
-                # Fallback: post a new message if update fails
-                # Add channel and thread_ts to the response for sending
-                fallback_response = response.copy()
-                fallback_response["channel"] = channel
-                fallback_response["thread_ts"] = thread_ts
-                say(**fallback_response)
+        try:
+            # Update the "Thinking..." message with the actual response
+            await self._call_slack_api(
+                "chat.update",
+                client.chat_update,
+                channel=channel,
+                ts=thinking_ts,
+                text=response.get("text", ""),
+                blocks=response.get("blocks", [])
+            )
+            logger.debug("Updated '%s' message with response in channel %s", self.DEFAULT_LOADING_TEXT, channel)
+            logger.debug("Response text: %s", response.get('text', ''))
+            logger.debug("Response blocks: %s", response.get('blocks', []))
+        except Exception as e:
+            logger.error("Error updating message: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            # Fallback: post a new message if update fails
+            # Add channel and thread_ts to the response for sending
+            fallback_response = response.copy()
+            fallback_response["channel"] = channel
+            fallback_response["thread_ts"] = thread_ts
+            await self._async_say(say, **fallback_response)
 
     def handle_message_event(self, message, say, client):
         """
@@ -475,6 +1026,45 @@ Respond using Slack markdown.
             say: Function to send a message
             client: Slack WebClient for API calls
         """
+        # Drop bot chatter before doing any work. Bolt's message listener only receives plain
+        # messages, bot_message, thread_broadcast and file_share, edits have their own listener
+        if (
+            message.get("bot_id") is not None
+            or message.get("subtype") == "bot_message"
+            or message.get("user") == self.bot_id
+        ):
+            logger.debug("Ignoring message with subtype %s", message.get("subtype"))
+            return
+        if self._message_batcher:
+            self._message_batcher.submit(message, say, client)
+            return
+        self.handle_user_input(message, say, client, is_mention=False)
+    
+    def handle_message_edit_event(self, message):
+        """
+        Handle a message_changed or message_deleted event from Slack.
+        
+        Args:
+            message: The message event data from Slack
+        """
+        self._forget_thread_history(message)
+    
+    def _handle_batched_messages(self, messages, say, client):
+        """
+        Answer a batch of messages coalesced by the MessageBatcher with a single response.
+        
+        Args:
+            messages: The buffered message events, oldest first
+            say: Function to send a message
+            client: Slack WebClient for API calls
+        """
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            # Reply to the first message of the burst with all texts combined
+            message = dict(messages[0])
+            message["text"] = "\n".join(m.get("text", "") for m in messages)
+            logger.info("Combined %s messages from user %s into one request", len(messages), message.get('user'))
         self.handle_user_input(message, say, client, is_mention=False)
     
     def handle_mention_event(self, event, say, client):
@@ -497,45 +1087,272 @@ Respond using Slack markdown.
             event: The app_home_opened event data from Slack
             client: Slack WebClient for API calls
         """
-        logger.debug(f"Handling app home event: {event}")
+        logger.debug("Handling app home event: %s", event)
         user_id = event.get("user")
-        view = self.generate_home_view()
+        # Slack only sends the view when one was published before, otherwise (e.g. after a
+        # reinstall) the cached state is stale and the view must be published again
+        if event.get("view") is not None:
+            with self._home_published_lock:
+                published = self._home_published.get(user_id)
+            if published is not None and published is self.generate_home_view():
+                logger.debug("Home view for user %s is up to date, skipping publish", user_id)
+                return
+        with self._home_published_lock:
+            if user_id in self._home_pending:
+                logger.debug("Home view publish already pending for user %s", user_id)
+                return
+            self._home_pending.add(user_id)
+        # Publish from the handler's loop so the Bolt worker is released right away
+        future = asyncio.run_coroutine_threadsafe(self._publish_home_view(user_id, client), self._get_loop())
+        future.add_done_callback(self._log_background_error)
+    
+    async def _publish_home_view(self, user_id, client):
+        """
+        Publish the App Home view for a user.
         
+        Args:
+            user_id: The Slack user ID
+            client: Slack WebClient for API calls
+        """
         try:
-            client.views_publish(user_id=user_id, view=view)
-            logger.info(f"Published home view for user {user_id}")
+            # The first view needs a blocking LLM info lookup, keep it off the loop
+            view = await asyncio.get_running_loop().run_in_executor(self._io_pool, self.generate_home_view)
+            await self._call_slack_api("views.publish", client.views_publish, user_id=user_id, view=view)
+            with self._home_published_lock:
+                self._home_published[user_id] = view
+            logger.info("Published home view for user %s", user_id)
         except Exception as e:
-            logger.error(f"Error publishing home view: {str(e)}", exc_info=True)
+            logger.error("Error publishing home view: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        finally:
+            with self._home_published_lock:
+                self._home_pending.discard(user_id)
     
 
-    async def generate_response(self, channel, thread_ts, text, event_data):
+    async def _fetch_conversation_history(self, channel, thread_ts, before_ts=None):
         """
-        Generate a response using the LLM.
+        Get the conversation history using the limits configured in the settings.
         
         Args:
             channel: The channel ID
             thread_ts: The thread timestamp
-            text: The text to respond to
-            event_data: The original event data
+            before_ts: Timestamp of the message being answered (optional)
             
         Returns:
-            dict: Response data including text and blocks
+            list: The conversation history formatted for LLM
         """
-        start_time = time.time()
-        
         # Get conversation context limit from settings (how many messages to include)
         conversation_context_limit = self.settings.get('conversation_context_limit', self.DEFAULT_CONVERSATION_CONTEXT_LIMIT)
         
         # Get conversation history period from settings (how far back to look)
         conversation_history_seconds = self.settings.get('conversation_history_seconds', self.DEFAULT_CONVERSATION_HISTORY_SECONDS)
         
-        # Get conversation history from Slack
-        conversation = await self.get_conversation_history(
+        return await self.get_conversation_history(
             channel, 
             thread_ts, 
             conversation_context_limit=conversation_context_limit,
-            conversation_history_seconds=conversation_history_seconds
+            conversation_history_seconds=conversation_history_seconds,
+            before_ts=before_ts
         )
+
+    @staticmethod
+    def _recent_history(history_buffer, limit, before=None):
+        """
+        Copy the most recent messages of a thread history buffer.
+        
+        Args:
+            history_buffer: The thread's buffered (ts, message) pairs
+            limit: Maximum number of messages to return
+            before: Only return messages older than this timestamp (optional)
+            
+        Returns:
+            list: The last `limit` messages, oldest first
+        """
+        if before is None:
+            skip = max(len(history_buffer) - limit, 0)
+            return [message for _, message in itertools.islice(history_buffer, skip, None)]
+        messages = [message for ts, message in history_buffer if ts < before]
+        return messages[-limit:]
+
+    async def _get_user_profile_prompt(self, user_id):
+        """
+        Get the user profile section appended to the system prompt.
+        
+        Args:
+            user_id: The Slack user ID
+            
+        Returns:
+            str: The user profile section, or an empty string if it is unavailable
+        """
+        try:
+            # Get user info from Slack
+            user_info = await self.slack_client._get_user_by_id(user_id)
+            if user_info:
+                _, _, user_email = user_info
+                if user_email:
+                    user_profile = {
+                        "email": user_email
+                    }
+                    logger.debug("Added user profile to system prompt: %s", user_profile)
+                    return f"\n\nThe user profile is the following: # USER PROFILE: {user_profile} # --- END OF USER PROFILE --- Consider information provided in the USER PROFILE if meaningful, take it into account."
+        except Exception as e:
+            logger.error("Error getting user profile: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return ""
+
+    async def _execute_completion(self, conversation, profile_task=None, on_partial=None):
+        """
+        Build a completion from the system prompt and conversation, and execute it.
+        
+        Args:
+            conversation: The conversation history, ending with the message to answer
+            profile_task: Task resolving to the user profile section of the system prompt (optional)
+            on_partial: Called from a worker thread with the text generated so far, streaming
+                        the completion when the LLM supports it (optional)
+            
+        Returns:
+            The LLM response
+        """
+        # Create a new completion
+        completion = self.llm_client.new_completion()
+        # Only add system message for standard models
+        #if llm_type != "SAVED_MODEL_AGENT" and llm_type != "RETRIEVAL_AUGMENTED":
+        if True:
+            system_prompt = self._system_prompt
+            
+            # Add the user profile looked up in the background
+            if profile_task:
+                system_prompt += await profile_task
+            
+            logger.debug("the formatted additional system prompt is: %s", system_prompt)
+            
+            completion.with_message(
+                system_prompt,
+                role="system"
+            )
+            
+        # Add conversation history as separate messages
+        for msg in conversation:
+            completion.with_message(
+                msg.get("content", ""),
+                role=msg.get("role")
+            )
+        
+        if on_partial and hasattr(completion, "execute_streamed"):
+            execute = functools.partial(self._execute_streamed, completion, on_partial)
+        else:
+            execute = completion.execute
+        
+        # Execute the completion off the event loop so other events keep progressing
+        async with self._llm_semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._io_pool, execute)
+
+    def _execute_streamed(self, completion, on_partial):
+        """
+        Execute a completion in streaming mode, reporting the text generated so far
+        at most every STREAM_UPDATE_INTERVAL_SECONDS. Runs in a worker thread.
+        
+        Args:
+            completion: The completion to execute
+            on_partial: Called with the text generated so far
+            
+        Returns:
+            StreamedResponse: The full response, the text received until the stream failed,
+                              or the non-streamed response if it failed before any text
+        """
+        parts = []
+        error_message = None
+        last_update = time.monotonic()
+        try:
+            for chunk in completion.execute_streamed():
+                chunk_data = getattr(chunk, "data", None) or {}
+                # The footer chunk reports errors that happened while generating
+                if chunk_data.get("errorMessage"):
+                    error_message = chunk_data["errorMessage"]
+                chunk_text = chunk_data.get("text")
+                if not chunk_text:
+                    continue
+                parts.append(chunk_text)
+                
+                now = time.monotonic()
+                if now - last_update >= self.STREAM_UPDATE_INTERVAL_SECONDS:
+                    last_update = now
+                    on_partial("".join(parts))
+        except Exception as e:
+            if not parts:
+                logger.warning("Streaming the completion failed, executing it without streaming: %s", e,
+                               exc_info=logger.isEnabledFor(logging.DEBUG))
+                return completion.execute()
+            # Executing it again would pay for the whole generation twice, keep what was received
+            logger.warning("Streaming the completion failed midway, keeping the partial response: %s", e,
+                           exc_info=logger.isEnabledFor(logging.DEBUG))
+            return StreamedResponse(text="".join(parts) + self.STREAM_INTERRUPTED_NOTE, interrupted=True)
+        
+        text = "".join(parts)
+        if error_message or not text:
+            return StreamedResponse(text=text, success=False, errorMessage=error_message or "The LLM returned an empty response")
+        return StreamedResponse(text=text)
+
+    def _update_partial_response(self, client, channel, ts, partial_text):
+        """
+        Replace the "Thinking..." message with a partially generated response.
+        Skipped rather than delayed when the partial update budget is used up,
+        since the final update follows anyway.
+        
+        Args:
+            client: Slack WebClient for API calls
+            channel: The channel ID
+            ts: The timestamp of the message to update
+            partial_text: The text generated so far
+        """
+        if not self._partial_update_limiter.try_acquire():
+            logger.debug("Skipping partial update of message %s, rate limited", ts)
+            return
+        
+        slack_text, _ = self.convert_to_slack_markdown(partial_text)
+        try:
+            client.chat_update(
+                channel=channel,
+                ts=ts,
+                text=slack_text,
+                blocks=[_mrkdwn_section(slack_text or " "), _context_block(f"_{self.DEFAULT_LOADING_TEXT}_")]
+            )
+        except Exception as e:
+            logger.debug("Error updating partial response: %s", e)
+
+    async def generate_response(self, channel, thread_ts, text, event_data, conversation=None, on_partial=None):
+        """
+        Generate a response using the LLM.
+        
+        Args:
+            channel: The channel ID
+            thread_ts: The thread timestamp
+            text: The text to respond to
+            event_data: The original event data
+            conversation: Conversation history already fetched by the caller (optional,
+                          fetched from Slack when not provided)
+            on_partial: Called from a worker thread with the text generated so far (optional).
+                        Not used for RAG responses, which are post-processed as a whole.
+            
+        Returns:
+            dict: Response data including text and blocks
+        """
+        start_time = time.monotonic()
+        
+        loop = asyncio.get_running_loop()
+        
+        # Look up the user profile while the history is fetched and the completion is set up
+        profile_task = None
+        user_id = event_data.get("user")
+        if self.llm_client and self.slack_client and user_id:
+            profile_task = asyncio.create_task(self._get_user_profile_prompt(user_id))
+        
+        # The first LLM info lookup is a blocking REST call, so run it off the loop meanwhile too
+        llm_info_future = None
+        if self.llm_client:
+            llm_info_future = loop.run_in_executor(self._io_pool, self.get_llm_info)
+        
+        # Get conversation history from Slack unless the caller already fetched it
+        if conversation is None:
+            conversation = await self._fetch_conversation_history(channel, thread_ts, before_ts=event_data.get("ts"))
         
         # Add the current message to the conversation history
         conversation.append({
@@ -547,70 +1364,48 @@ Respond using Slack markdown.
         response_text = None
         custom_blocks = False
         response_blocks = []
+        image_blocks = []
         
         if self.llm_client:
             try:
                 logger.debug("Generating response using LLM...")
+                _, llm_type = await llm_info_future
                 
-                # Create a new completion
-                completion = self.llm_client.new_completion()
-                _, llm_type = self.get_llm_info()
-                # Only add system message for standard models
-                #if llm_type != "SAVED_MODEL_AGENT" and llm_type != "RETRIEVAL_AUGMENTED":
-                if True:
-                    # Get system prompt from settings or use default
-                    use_custom_system_prompt = self.settings.get('use_custom_system_prompt', False)
-                    logger.info(f"the use_custom_system_prompt is {use_custom_system_prompt}")
-                    
-                    if use_custom_system_prompt and self.settings.get('custom_system_prompt'):
-                        system_prompt = self.settings.get('custom_system_prompt')
-                    else:
-                        system_prompt = self.DEFAULT_SYSTEM_PROMPT
-                        
-                    system_prompt = system_prompt.format(bot_name=self.bot_name)
-                    
-                    # Get user profile information
-                    user_id = event_data.get("user")
-                    if user_id:
-                        try:
-                            # Get user info from Slack
-                            user_info = await self.slack_client._get_user_by_id(user_id)
-                            if user_info:
-                                _, _, user_email = user_info
-                                if user_email:
-                                    # Add user profile to system prompt
-                                    user_profile = {
-                                        "email": user_email
-                                    }
-                                    system_prompt += f"\n\nThe user profile is the following: # USER PROFILE: {user_profile} # --- END OF USER PROFILE --- Consider information provided in the USER PROFILE if meaningful, take it into account."
-                                    logger.debug(f"Added user profile to system prompt: {user_profile}")
-                        except Exception as e:
-                            logger.error(f"Error getting user profile: {str(e)}", exc_info=True)
-                    
-                    logger.debug(f"the formatted additional system prompt is: {system_prompt}")
-                    
-                    completion.with_message(
-                        system_prompt,
-                        role="system"
+                # Standalone questions (no conversation history) may have been answered before.
+                # An answer shaped by the asker's profile is only reused for that user
+                cacheable = self._response_cache is not None and len(conversation) == 1
+                cache_scope = None
+                llm_text = None
+                if cacheable:
+                    if profile_task and await profile_task:
+                        cache_scope = user_id
+                    llm_text = await loop.run_in_executor(self._io_pool, self._response_cache.get, text, cache_scope)
+                
+                if llm_text is None:
+                    llm_response = await self._execute_completion(
+                        conversation,
+                        profile_task,
+                        on_partial=on_partial if llm_type != "RETRIEVAL_AUGMENTED" else None
                     )
                     
-                # Add conversation history as separate messages
-                for msg in conversation:
-                    completion.with_message(
-                        msg.get("content", ""),
-                        role=msg.get("role")
-                    )
-                
-                # Execute the completion
-                llm_response = completion.execute()
+                    # Check if the response is successful
+                    if llm_response.success:
+                        llm_text = llm_response.text
+                        if cacheable and not getattr(llm_response, "interrupted", False):
+                            # Store it in the background, it may need an embedding call
+                            loop.run_in_executor(self._io_pool, self._response_cache.put, text, llm_text, cache_scope)
+                    else:
+                        error_msg = str(llm_response.errorMessage) if hasattr(llm_response, 'errorMessage') else "Unknown error"
+                        logger.error("LLM returned an error: %s", error_msg)
+                        response_text = f"I'm sorry, I couldn't generate a response: {error_msg}"
+                else:
+                    logger.debug("Using cached LLM response")
                 
-                # Check if the response is successful
-                if llm_response.success:
-                    response_text = llm_response.text
-                    logger.debug(f"LLM response: {response_text}")
+                if llm_text is not None:
+                    logger.debug("LLM response: %s", llm_text)
                     
                     # Convert response to Slack markdown format and get image blocks
-                    response_text, image_blocks = self.convert_to_slack_markdown(response_text)
+                    response_text, image_blocks = self.convert_to_slack_markdown(llm_text)
                     
                     # Check if we're using a RAG model
                     if llm_type == "RETRIEVAL_AUGMENTED":
@@ -620,15 +1415,10 @@ Respond using Slack markdown.
                             response_text = processed_text
                             response_blocks = rag_blocks
                             custom_blocks = True
-                    
-                else:
-                    error_msg = str(llm_response.errorMessage) if hasattr(llm_response, 'errorMessage') else "Unknown error"
-                    logger.error(f"LLM returned an error: {error_msg}")
-                    response_text = f"I'm sorry, I couldn't generate a response: {error_msg}"
                 
             except Exception as e:
-                logger.error(f"Error generating LLM response: {str(e)}", exc_info=True)
-                response_text = f"I'm sorry, an error occurred while generating a response: {str(e)}"
+                logger.error("Error generating LLM response: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+                response_text = self.ERROR_RESPONSE_TEXT
         else:
             # Fallback to echo response if LLM is not available
             logger.warning("LLM client not available, using fallback response")
@@ -636,51 +1426,23 @@ Respond using Slack markdown.
             prefix = "You mentioned me and said: " if event_type == "mention" else "You said: "
             response_text = f"{prefix}{text}"
         
-        processing_time = time.time() - start_time
-        logger.debug(f"Finished processing in {processing_time:.2f} seconds")
+        processing_time = time.monotonic() - start_time
+        logger.debug("Finished processing in %.2f seconds", processing_time)
         
         # Format the response if not already formatted by RAG
         if not custom_blocks:
-            # Check if the message is from a bot (not the current bot)
-            is_from_bot = event_data.get("bot_id") is not None and event_data.get("bot_id") != self.bot_id
-            
-            # Standard message formatting
-            response_blocks = []
-            
-            # Only include "You asked" section if it's not from a bot
-            if not is_from_bot:
-                response_blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"_You asked: {text.replace('_', '')}_" 
-                    }
-                })
-            
-            # Add the response text section
-            response_blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": response_text
-                }
-            })
+            # Standard message formatting, bot messages never get this far
+            response_blocks = [
+                _mrkdwn_section(f"_You asked: {text.replace('_', '')}_"),
+                _mrkdwn_section(response_text),
+            ]
             
             # Add any image blocks found during markdown conversion
-            if 'image_blocks' in locals():
-                response_blocks.extend(image_blocks)
+            response_blocks.extend(image_blocks)
         
         # Add the context element with processing time to all responses
         response_blocks.append(
-            {
-                "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"Processed in {processing_time:.2f} seconds to <@{event_data.get('user')}>'s question"
-                    }
-                ]
-            }
+            _context_block(f"Processed in {processing_time:.2f} seconds to <@{event_data.get('user')}>'s question")
         )
         
         response = {
@@ -689,84 +1451,63 @@ Respond using Slack markdown.
         }
         
         # Log the response we're returning
-        logger.debug(f"Formatted response with text: {response_text[:50]}... and {len(response['blocks'])} blocks")
+        logger.debug("Formatted response with text: %s... and %s blocks", response_text[:50], len(response['blocks']))
         
         return response
     
 
+    def _get_llm_info_block(self):
+        """
+        Get the App Home section describing the configured LLM.
+        The block is reused until the LLM's name or type changes, which also drops the cached view.
+        
+        Returns:
+            dict: The section block (shared, do not mutate)
+        """
+        # Get LLM information
+        llm_name, llm_type = self.get_llm_info()
+        
+        # Set header text based on LLM type
+        if llm_type == "SAVED_MODEL_AGENT":
+            header_text = "Using Agent:"
+        elif llm_type == "RETRIEVAL_AUGMENTED":
+            header_text = "Using RAG:"
+        else:
+            header_text = "Using LLM:"
+        
+        text = f"*{header_text}* {llm_name} (ID: {self.llm_id})"
+        if self._llm_info_block is None or self._llm_info_block["text"]["text"] != text:
+            self._llm_info_block = _mrkdwn_section(text)
+            # The cached view holds the previous block
+            self._home_view = None
+        return self._llm_info_block
+
     def generate_home_view(self):
         """
         Generate the App Home view content.
+        The view only changes with the tools and the LLM info, so it is built once
+        and reused until either changes.
         
         Returns:
-            dict: The view object for the App Home
+            dict: The view object for the App Home (shared, do not mutate)
         """
-        blocks = [
-            {
-                "type": "header",
-                "text": {"type": "plain_text", "text": "Welcome to Slack Integration!"},
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "This is a Slack integration for Dataiku DSS.",
-                },
-            },
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": "*Available Tools:*"},
-            },
-        ]
+        # Checked first, a changed LLM info block drops the cached view
+        llm_info_block = self._get_llm_info_block() if self.llm_id else None
+        if self._home_view is not None:
+            return self._home_view
+        
+        blocks = list(_HOME_PREFIX_BLOCKS)
 
         # Add tools
-        for tool in self.tools:
-            blocks.append(
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"• *{tool.name}*: {tool.description}",
-                    },
-                }
-            )
+        blocks.extend(self._tool_blocks)
 
         # Add LLM info if available
-        if self.llm_id:
-            # Get LLM information
-            llm_name, llm_type = self.get_llm_info()
-            
-            # Set header text based on LLM type
-            if llm_type == "SAVED_MODEL_AGENT":
-                header_text = "Using Agent:"
-            elif llm_type == "RETRIEVAL_AUGMENTED":
-                header_text = "Using RAG:"
-            else:
-                header_text = "Using LLM:"
-                
-            blocks.append(
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*{header_text}* {llm_name} (ID: {self.llm_id})",
-                    },
-                }
-            )
+        if llm_info_block is not None:
+            blocks.append(llm_info_block)
 
         # Add usage section
-        blocks.append(
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": (
-                        "*How to Use:*\n• Send me a direct message\n"
-                        f"• Mention me in a channel with @{self.bot_name or 'Bot'}"
-                    ),
-                },
-            }
-        )
+        blocks.append(_usage_block(self.bot_name))
         
-        return {"type": "home", "blocks": blocks} 
+        self._home_view = {"type": "home", "blocks": blocks}
+        return self._home_view
     
\ No newline at end of file
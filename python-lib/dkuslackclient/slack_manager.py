@@ -1,14 +1,16 @@
 from utils.logging import logger
 from slack_bolt import App
-from slack_bolt.adapter.socket_mode import SocketModeHandler
-from slack_bolt.adapter.flask import SlackRequestHandler
-import threading
+from slack_bolt.authorization import AuthorizeResult
 import asyncio
-import hmac
-import hashlib
-import time
+import re
+import concurrent.futures
 from .slack_event_handler import SlackEventHandler
 from .dku_slack_client import DKUSlackClient
+from .request_verification import KeyedRequestVerification
+
+# Bound once for the listeners, which log on every event
+_debug = logger.debug
+
 
 class SlackManager:
     """
@@ -16,6 +18,9 @@ class SlackManager:
     Supports both socket mode and HTTP endpoint mode.
     """
     
+    # Constants
+    LISTENER_EXECUTOR_MAX_WORKERS = 16  # Threads running Bolt listeners after the request is acknowledged
+    
     def __init__(self, slack_bot_token, slack_app_token=None, slack_signing_secret=None, settings=None):
         """
         Initialize the SlackManager.
@@ -42,10 +47,29 @@ class SlackManager:
         self.slack_client_instance = DKUSlackClient(slack_bot_token)
         
         # Initialize Slack App instance
-        self.app = App(token=slack_bot_token, signing_secret=slack_signing_secret)
+        # In HTTP mode, requests are verified by KeyedRequestVerification instead of Bolt's
+        # built-in middleware, which rehashes the signing secret on every request
+        verify_with_keyed_hmac = self.mode == "http" and bool(slack_signing_secret)
+        # Listeners run after Slack's request is acknowledged, in both modes. Bolt's default pool
+        # has 5 threads and is never shut down, so give it a named pool owned by the manager
+        self._listener_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.LISTENER_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="slack-listener"
+        )
+        self._authorize_result = None
+        self.app = App(
+            # Requests are authorized with the auth.test response the DKUSlackClient got when
+            # testing the token, given a token Bolt would call auth.test again on the first request.
+            # Bolt passes arguments by name, so this is a closure rather than a bound method
+            authorize=lambda: self._authorize_result,
+            signing_secret=slack_signing_secret,
+            request_verification_enabled=not verify_with_keyed_hmac,
+            # Runs where the built-in verification would, before authorization
+            before_authorize=KeyedRequestVerification(slack_signing_secret) if verify_with_keyed_hmac else None,
+            listener_executor=self._listener_executor
+        )
         self.request_handler = None
         self.socket_mode_handler = None
-        self.thread = None
         
         # Fetch bot info
         self._initialize_bot_info()
@@ -61,20 +85,31 @@ class SlackManager:
         # Set up event handlers
         self._setup_listeners()
         
-        logger.info(f"SlackManager initialized in {self.mode} mode with LLM ID: {self.settings.get('llm_id')}")
+        logger.info("SlackManager initialized in %s mode with LLM ID: %s", self.mode, self.settings.get('llm_id'))
         
     def _initialize_bot_info(self):
         """Get the bot's ID and name."""
         try:
             logger.debug("Fetching app authentication info...")
-            # Use the DKUSlackClient's AsyncWebClient directly
-            auth_info = asyncio.run(self.slack_client_instance.slack_async_web_client.auth_test())
+            # Reuse the auth.test response the DKUSlackClient got when testing the token
+            auth_info = self.slack_client_instance.auth_info
+            if auth_info is None:
+                auth_info = asyncio.run(self.slack_client_instance.slack_async_web_client.auth_test())
             
             self.bot_id = auth_info["user_id"]
             self.bot_name = auth_info["user"]
-            logger.info(f"App initialized with User ID: {self.bot_id} and Name: {self.bot_name}")
+            self._authorize_result = AuthorizeResult(
+                enterprise_id=auth_info.get("enterprise_id"),
+                team_id=auth_info.get("team_id"),
+                team=auth_info.get("team"),
+                url=auth_info.get("url"),
+                bot_user_id=auth_info.get("user_id"),
+                bot_id=auth_info.get("bot_id"),
+                bot_token=self.slack_bot_token
+            )
+            logger.info("App initialized with User ID: %s and Name: %s", self.bot_id, self.bot_name)
         except Exception as e:
-            logger.error(f"Failed to get app info: {str(e)}", exc_info=True)
+            logger.error("Failed to get app info: %s", e, exc_info=True)
             self.bot_id = None
             self.bot_name = None
     
@@ -82,26 +117,36 @@ class SlackManager:
         """Set up event listeners for the Slack app."""
         logger.debug("Setting up event listeners...")
         
-        # Handle message events
-        @self.app.message()
-        def handle_message(message, say, client):
-            logger.debug(f"Received message event: {message}")
-            # Delegate handling to the event handler
-            self.event_handler.handle_message_event(message, say, client)
-        
-        # Handle app mention events
-        @self.app.event("app_mention")
-        def handle_app_mention(event, say, client):
-            logger.debug(f"Received app mention event: {event}")
-            # Delegate handling to the event handler
-            self.event_handler.handle_mention_event(event, say, client)
-        
-        # Handle app home opened events
-        @self.app.event("app_home_opened")
-        def handle_app_home_opened(event, client):
-            logger.debug(f"Received app home opened event: {event}")
-            # Delegate handling to the event handler
-            self.event_handler.handle_app_home_event(event, client)
+        # Bound methods are registered directly, Bolt injects the arguments they name
+        self.app.message()(self._on_message)
+        # app.message() doesn't match edits and deletions, which invalidate buffered thread history
+        self.app.event({"type": "message", "subtype": re.compile(r"message_(changed|deleted)")})(self._on_message_edit)
+        self.app.event("app_mention")(self._on_app_mention)
+        self.app.event("app_home_opened")(self._on_app_home_opened)
+    
+    def _on_message(self, message, say, client):
+        """Handle message events."""
+        _debug("Received message event: %s", message)
+        # Delegate handling to the event handler
+        self.event_handler.handle_message_event(message, say, client)
+    
+    def _on_message_edit(self, event):
+        """Handle message edit and deletion events."""
+        _debug("Received message edit event: %s", event)
+        # Delegate handling to the event handler
+        self.event_handler.handle_message_edit_event(event)
+    
+    def _on_app_mention(self, event, say, client):
+        """Handle app mention events."""
+        _debug("Received app mention event: %s", event)
+        # Delegate handling to the event handler
+        self.event_handler.handle_mention_event(event, say, client)
+    
+    def _on_app_home_opened(self, event, client):
+        """Handle app home opened events."""
+        _debug("Received app home opened event: %s", event)
+        # Delegate handling to the event handler
+        self.event_handler.handle_app_home_event(event, client)
     
     def start(self):
         """Start the Slack integration based on the configured mode."""
@@ -111,7 +156,7 @@ class SlackManager:
             return self._prepare_http_mode()
     
     def _start_socket_mode(self):
-        """Start the Socket Mode handler in a separate thread."""
+        """Connect the Socket Mode handler without blocking the caller."""
         if not self.slack_app_token:
             error_msg = "Cannot start in socket mode without an app token"
             logger.error(error_msg)
@@ -120,37 +165,28 @@ class SlackManager:
         try:
             logger.info("Starting Slack in socket mode...")
             
+            # Only imported in socket mode, so HTTP mode doesn't load the websocket stack
+            from slack_bolt.adapter.socket_mode import SocketModeHandler
+            
             # Initialize the Socket Mode handler
             self.socket_mode_handler = SocketModeHandler(self.app, self.slack_app_token)
             
-            # Start in a separate thread
-            self.thread = threading.Thread(
-                target=self._run_socket_handler,
-                name="SlackSocketHandler"
-            )
-            self.thread.daemon = True
-            self.thread.start()
+            # connect() returns once the connection is open, the Socket Mode client receives
+            # and dispatches events on its own threads. start() would only add a thread
+            # blocking forever on top of that
+            self.socket_mode_handler.connect()
             
-            logger.info(f"Slack socket mode handler started in a background thread (Thread ID: {self.thread.ident}, Name: {self.thread.name})")
+            logger.info("Slack socket mode handler connected")
             return True
         except Exception as e:
-            logger.error(f"Failed to start socket mode: {str(e)}", exc_info=True)
-            raise
-    
-    def _run_socket_handler(self):
-        """Run the socket mode handler (called in a thread)."""
-        try:
-            # Set thread name in logs for better traceability
-            logger.debug(f"Socket mode handler thread starting (Thread ID: {threading.get_ident()}, Name: {threading.current_thread().name})")
-            self.socket_mode_handler.start()
-        except Exception as e:
-            logger.error(f"Error in socket mode thread: {str(e)}", exc_info=True)
-            # Re-raise the exception to ensure it's visible in the main process
+            logger.error("Failed to start socket mode: %s", e, exc_info=True)
             raise
     
     def _prepare_http_mode(self):
         """Prepare for HTTP mode by creating a request handler."""
         logger.info("Preparing Slack for HTTP mode...")
+        # Only imported in HTTP mode, socket mode doesn't need the Flask adapter
+        from slack_bolt.adapter.flask import SlackRequestHandler
         self.request_handler = SlackRequestHandler(self.app)
         logger.info("Slack HTTP request handler initialized")
         return self.request_handler
@@ -165,7 +201,10 @@ class SlackManager:
                 self.socket_mode_handler.close()
                 logger.info("Socket mode handler closed")
         except Exception as e:
-            logger.error(f"Error closing socket mode handler: {str(e)}", exc_info=True)
+            logger.error("Error closing socket mode handler: %s", e, exc_info=True)
+        
+        # Stop taking new listener work, listeners already running finish on their own
+        self._listener_executor.shutdown(wait=False)
         
         logger.info("Cleanup process completed")
     
@@ -66,6 +66,9 @@ class LazyLogger:
         self._initialize_logger()
         self._logger.warning(msg, *args, **kwargs)
 
+    def warning(self, msg, *args, **kwargs):
+        self.warn(msg, *args, **kwargs)
+
     def error(self, msg, *args, **kwargs):
         self._initialize_logger()
         self._logger.error(msg, *args, **kwargs)
@@ -66,15 +66,16 @@ def list_groups_with_details() -> Dict[str, List[Dict[str, str]]]:
 
     return {"choices": group_choices}
 
-def list_available_llms() -> Dict[str, List[Dict[str, str]]]:
+def list_available_llms(purpose: str = "GENERIC_COMPLETION") -> Dict[str, List[Dict[str, str]]]:
     """
     Lists all LLMs available to the Dataiku project.
     
+    :param purpose: The purpose the LLMs must support (e.g., "GENERIC_COMPLETION", "TEXT_EMBEDDING_EXTRACTION")
     :return: A dictionary with a "choices" key containing a list of LLM details.
     """
     client = dataiku.api_client()
     project = client.get_default_project()
-    llms = project.list_llms()
+    llms = project.list_llms(purpose=purpose)
     llm_choices: List[Dict[str, str]] = []
 
     for llm in llms:
@@ -99,6 +100,8 @@ def do(payload, config, plugin_config, inputs):
         return list_groups_with_details()
     elif parameter_name == "llm_id":
         return list_available_llms()
+    elif parameter_name == "response_cache_embedding_llm_id":
+        return list_available_llms(purpose="TEXT_EMBEDDING_EXTRACTION")
     else:
         return {
             "choices": [
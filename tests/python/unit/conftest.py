@@ -0,0 +1,13 @@
+import os
+import sys
+import types
+
+# Make the plugin's python-lib importable, as DSS does for the plugin code
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "python-lib"))
+
+# The dkuslackclient package imports dataiku, which only exists inside DSS
+if "dataiku" not in sys.modules:
+    try:
+        import dataiku  # noqa: F401
+    except ImportError:
+        sys.modules["dataiku"] = types.ModuleType("dataiku")
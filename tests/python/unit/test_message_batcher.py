@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+from dkuslackclient.message_batcher import MessageBatcher
+
+
+def _start_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+def _message(text, user="U1", channel="D1"):
+    return {"channel": channel, "user": user, "text": text}
+
+
+class Flushes:
+    def __init__(self):
+        self.batches = []
+        self.flushed = threading.Event()
+
+    def __call__(self, events, say, client):
+        self.batches.append([event["text"] for event in events])
+        self.flushed.set()
+
+
+def test_burst_is_flushed_once_after_the_window():
+    loop = _start_loop()
+    flushes = Flushes()
+    batcher = MessageBatcher(flushes, lambda: loop, window_seconds=0.05)
+    batcher.submit(_message("a"), say=None, client=None)
+    batcher.submit(_message("b"), say=None, client=None)
+    assert flushes.flushed.wait(timeout=5)
+    assert flushes.batches == [["a", "b"]]
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_users_are_batched_separately():
+    loop = _start_loop()
+    flushes = Flushes()
+    batcher = MessageBatcher(flushes, lambda: loop, window_seconds=0.05)
+    batcher.submit(_message("a", user="U1"), say=None, client=None)
+    batcher.submit(_message("b", user="U2"), say=None, client=None)
+    # Wait past both windows
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.2), loop).result(timeout=5)
+    assert sorted(flushes.batches) == [["a"], ["b"]]
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_full_batch_is_flushed_right_away_and_its_window_ignored():
+    loop = _start_loop()
+    flushes = Flushes()
+    batcher = MessageBatcher(flushes, lambda: loop, window_seconds=0.1, max_batch_size=2)
+    batcher.submit(_message("a"), say=None, client=None)
+    batcher.submit(_message("b"), say=None, client=None)
+    assert flushes.batches == [["a", "b"]]
+
+    # A new batch for the same key is not flushed early when the full batch's window ends
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result(timeout=5)
+    batcher.submit(_message("c"), say=None, client=None)
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.08), loop).result(timeout=5)
+    assert flushes.batches == [["a", "b"]]
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.2), loop).result(timeout=5)
+    assert flushes.batches == [["a", "b"], ["c"]]
+    loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,46 @@
+import asyncio
+
+from dkuslackclient.rate_limiter import TokenBucket
+
+
+def test_burst_then_refusal():
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_tokens_refill_over_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("dkuslackclient.rate_limiter.time.monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2, capacity=1)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    now[0] += 0.5
+    assert bucket.try_acquire()
+    # Idle time never adds more than the capacity
+    now[0] += 60
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_acquire_waits_on_the_event_loop():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    async def acquire_twice():
+        # Another coroutine keeps running while the second acquire waits
+        ticks = []
+
+        async def tick():
+            for _ in range(3):
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        first = await bucket.acquire()
+        second, _ = await asyncio.gather(bucket.acquire(), tick())
+        return first, second, len(ticks)
+
+    first, second, ticks = asyncio.run(acquire_twice())
+    assert first == 0
+    assert 0 < second < 1
+    assert ticks == 3
@@ -0,0 +1,32 @@
+import time
+
+from slack_sdk.signature import SignatureVerifier
+
+from dkuslackclient.request_verification import KeyedRequestVerification, KeyedSignatureVerifier
+
+SIGNING_SECRET = "8f742231b10e8888abcd99yyyzzz85a5"
+
+
+def test_signature_matches_slack_sdk():
+    keyed = KeyedSignatureVerifier(SIGNING_SECRET)
+    reference = SignatureVerifier(SIGNING_SECRET)
+    for body in ["", "token=xyz&team_id=T1&text=hello", '{"type":"event_callback","event":{"text":"héllo"}}']:
+        timestamp = str(int(time.time()))
+        expected = reference.generate_signature(timestamp=timestamp, body=body)
+        assert keyed.generate_signature(timestamp=timestamp, body=body) == expected
+        assert keyed.generate_signature(timestamp=timestamp, body=body.encode()) == expected
+
+
+def test_is_valid():
+    keyed = KeyedSignatureVerifier(SIGNING_SECRET)
+    timestamp = str(int(time.time()))
+    body = "token=xyz&team_id=T1"
+    signature = SignatureVerifier(SIGNING_SECRET).generate_signature(timestamp=timestamp, body=body)
+    assert keyed.is_valid(body, timestamp, signature)
+    assert not keyed.is_valid(body + "&x=1", timestamp, signature)
+    assert not keyed.is_valid(body, str(int(time.time()) - 600), signature)
+
+
+def test_middleware_uses_keyed_verifier():
+    middleware = KeyedRequestVerification(SIGNING_SECRET)
+    assert isinstance(middleware.verifier, KeyedSignatureVerifier)
@@ -0,0 +1,81 @@
+from dkuslackclient.response_cache import ResponseCache
+
+# Embeddings of the normalized questions: "what is dss?" and its paraphrase are close,
+# "how do i log in?" points elsewhere
+EMBEDDINGS = {
+    "what is dss?": [1.0, 0.0, 0.0],
+    "tell me what dss is": [0.95, 0.31, 0.0],
+    "how do i log in?": [0.0, 0.0, 1.0],
+}
+
+
+class FakeEmbeddingLLM:
+    """Returns fixed embeddings, counting the texts it embeds."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def new_embeddings(self):
+        llm = self
+
+        class Query:
+            def add_text(self, text):
+                self.text = text
+
+            def execute(self):
+                llm.embedded.append(self.text)
+                embedding = EMBEDDINGS[self.text]
+
+                class Response:
+                    def get_embeddings(self):
+                        return [embedding]
+                return Response()
+        return Query()
+
+
+def test_exact_match_ignores_case_and_whitespace():
+    cache = ResponseCache()
+    cache.put("What is  DSS?", "A platform")
+    assert cache.get("  what is dss? ") == "A platform"
+    assert cache.get("what is dss") is None
+
+
+def test_scoped_answers_are_not_shared():
+    cache = ResponseCache()
+    cache.put("What is DSS?", "Shared answer")
+    cache.put("How do I log in?", "Answer for U1", scope="U1")
+    assert cache.get("How do I log in?", scope="U1") == "Answer for U1"
+    assert cache.get("How do I log in?", scope="U2") is None
+    assert cache.get("How do I log in?") is None
+    # Shared answers are not served to scoped lookups either
+    assert cache.get("What is DSS?", scope="U1") is None
+
+
+def test_semantic_match_stays_within_its_scope():
+    cache = ResponseCache(embedding_llm=FakeEmbeddingLLM())
+    cache.put("What is DSS?", "Answer for U1", scope="U1")
+    assert cache.get("Tell me what DSS is", scope="U1") == "Answer for U1"
+    assert cache.get("Tell me what DSS is", scope="U2") is None
+    assert cache.get("Tell me what DSS is") is None
+
+
+def test_semantic_match_respects_the_threshold():
+    cache = ResponseCache(embedding_llm=FakeEmbeddingLLM())
+    cache.put("What is DSS?", "A platform")
+    assert cache.get("How do I log in?") is None
+    # The paraphrase scores about 0.95
+    assert cache.get("Tell me what DSS is") == "A platform"
+    strict = ResponseCache(embedding_llm=FakeEmbeddingLLM(), similarity_threshold=0.99)
+    strict.put("What is DSS?", "A platform")
+    assert strict.get("Tell me what DSS is") is None
+
+
+def test_put_reuses_the_embedding_of_the_missed_lookup():
+    llm = FakeEmbeddingLLM()
+    cache = ResponseCache(embedding_llm=llm)
+    assert cache.get("What is DSS?", scope="U1") is None
+    cache.put("What is DSS?", "A platform", scope="U1")
+    assert llm.embedded == ["what is dss?"]
+    # A put without a preceding lookup embeds the question itself
+    cache.put("How do I log in?", "With SSO")
+    assert llm.embedded == ["what is dss?", "how do i log in?"]
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from dkuslackclient.slack_event_handler import SlackEventHandler, _retry_after_seconds
+
+BOT_ID = "UBOT"
+CHANNEL = "C1"
+THREAD_TS = "100.000000"
+
+
+class FakeSlackClient:
+    """Serves the replies of one thread, honoring the oldest bound like conversations.replies."""
+
+    def __init__(self):
+        self.replies = []
+        self.oldest_requested = []
+
+    async def fetch_thread_replies(self, channel_id, thread_ts, resolve_users=True, oldest=None):
+        self.oldest_requested.append(oldest)
+        return [
+            dict(message) for message in self.replies
+            if oldest is None or float(message["ts"]) > float(oldest)
+        ], None
+
+
+def _history(handler, before_ts):
+    # Fetched on the handler's loop, as when answering an event
+    return asyncio.run_coroutine_threadsafe(handler.get_conversation_history(
+        CHANNEL, THREAD_TS, conversation_context_limit=10, before_ts=before_ts
+    ), handler._get_loop()).result(timeout=5)
+
+
+def test_thread_buffer_skips_answers_still_being_generated():
+    client = FakeSlackClient()
+    handler = SlackEventHandler(BOT_ID, "bot", slack_client=client, settings={})
+
+    # A follow-up arrives while the first answer is still "Thinking..."
+    client.replies = [
+        {"ts": "101.000000", "user": "U1", "text": "first question"},
+        {"ts": "102.000000", "user": BOT_ID, "text": "_Thinking..._"},
+        {"ts": "103.000000", "user": "U1", "text": "second question"},
+    ]
+    assert _history(handler, "103.000000") == [{"role": "user", "content": "first question"}]
+
+    # Another follow-up once the first answer is complete and the second one is streaming
+    client.replies[1] = {"ts": "102.000000", "user": BOT_ID, "text": "first answer"}
+    client.replies += [
+        {
+            "ts": "104.000000", "user": BOT_ID, "text": "second ans",
+            "blocks": [
+                {"type": "section", "text": {"type": "mrkdwn", "text": "second ans"}},
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": "_Thinking..._"}]},
+            ],
+        },
+        {"ts": "105.000000", "user": "U1", "text": "third question"},
+    ]
+    assert _history(handler, "105.000000") == [
+        {"role": "user", "content": "first question"},
+        {"role": "assistant", "content": "first answer"},
+        {"role": "user", "content": "second question"},
+    ]
+    # Only the settled replies were buffered, the streaming answer is fetched again
+    assert client.oldest_requested == [None, "101.000000"]
+
+    client.replies[3] = {"ts": "104.000000", "user": BOT_ID, "text": "second answer"}
+    assert _history(handler, "106.000000") == [
+        {"role": "user", "content": "first question"},
+        {"role": "assistant", "content": "first answer"},
+        {"role": "user", "content": "second question"},
+        {"role": "assistant", "content": "second answer"},
+        {"role": "user", "content": "third question"},
+    ]
+    assert client.oldest_requested[-1] == "103.000000"
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.data = {"text": text}
+
+
+class FailingStreamCompletion:
+    """Streams a few chunks, then fails like a dropped connection."""
+
+    def __init__(self):
+        self.executed = 0
+
+    def execute_streamed(self):
+        yield FakeChunk("Hello ")
+        yield FakeChunk("world")
+        raise ConnectionError("stream closed")
+
+    def execute(self):
+        self.executed += 1
+
+
+def test_stream_failure_keeps_the_received_text():
+    handler = SlackEventHandler(BOT_ID, "bot", settings={})
+    completion = FailingStreamCompletion()
+    response = handler._execute_streamed(completion, on_partial=lambda text: None)
+    assert completion.executed == 0
+    assert response.success and response.interrupted
+    assert response.text.startswith("Hello world")
+
+
+def test_strip_mention():
+    handler = SlackEventHandler(BOT_ID, "bot", settings={})
+    assert handler._strip_mention("<@UBOT> hello") == "hello"
+    assert handler._strip_mention("<@UBOT> hi <@UBOT> there") == "hi there"
+    assert handler._strip_mention("hello <@UBOT> there") == "hello there"
+    assert handler._strip_mention("  hello  ") == "hello"
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_retry_after_seconds():
+    assert _retry_after_seconds({"Retry-After": "7"}) == 7
+    assert _retry_after_seconds({"retry-after": ["3"]}) == 3
+    assert _retry_after_seconds({"Retry-After": "soon"}) == 0
+    assert _retry_after_seconds({}) == 0
+    assert _retry_after_seconds(None) == 0
+
+
+def test_rate_limited_call_is_retried(monkeypatch):
+    monkeypatch.setattr(SlackEventHandler, "SLACK_API_BASE_BACKOFF_SECONDS", 0)
+    handler = SlackEventHandler(BOT_ID, "bot", settings={})
+    calls = []
+
+    def chat_update(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise SlackApiError("ratelimited", FakeResponse(429, {"Retry-After": "0"}))
+        return {"ok": True}
+
+    response = asyncio.run(handler._call_slack_api("chat.update", chat_update, channel=CHANNEL, ts="1.0"))
+    assert response == {"ok": True}
+    assert len(calls) == 3
+
+
+def test_other_errors_and_exhausted_retries_raise(monkeypatch):
+    monkeypatch.setattr(SlackEventHandler, "SLACK_API_BASE_BACKOFF_SECONDS", 0)
+    handler = SlackEventHandler(BOT_ID, "bot", settings={})
+    calls = []
+
+    def failing(status_code):
+        def call(**kwargs):
+            calls.append(status_code)
+            raise SlackApiError("failed", FakeResponse(status_code))
+        return call
+
+    for status_code, expected_calls in ((500, 1), (429, 1 + SlackEventHandler.SLACK_API_MAX_RETRIES)):
+        calls.clear()
+        with pytest.raises(SlackApiError):
+            asyncio.run(handler._call_slack_api("chat.update", failing(status_code), channel=CHANNEL))
+        assert len(calls) == expected_calls
+
+
+def test_home_view_follows_llm_renames(monkeypatch):
+    names = ["First name"]
+    monkeypatch.setattr(
+        "dkuslackclient.slack_event_handler._fetch_llm_meta",
+        lambda llm_id: (names[0], "OPENAI")
+    )
+    handler = SlackEventHandler(BOT_ID, "bot", settings={"llm_id": "llm-1"})
+    view = handler.generate_home_view()
+    assert handler.generate_home_view() is view
+    assert "First name" in view["blocks"][-2]["text"]["text"]
+
+    names[0] = "Second name"
+    renamed = handler.generate_home_view()
+    assert renamed is not view
+    assert "Second name" in renamed["blocks"][-2]["text"]["text"]
+    assert handler.get_llm_info() == ("Second name", "OPENAI")
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import time
+
+from slack_bolt.request import BoltRequest
+from slack_sdk import WebClient
+from slack_sdk.signature import SignatureVerifier
+
+from dkuslackclient import slack_manager
+from dkuslackclient.slack_event_handler import SlackEventHandler
+from dkuslackclient.slack_manager import SlackManager
+
+BOT_TOKEN = "xoxb-test"
+SIGNING_SECRET = "8f742231b10e8888abcd99yyyzzz85a5"
+AUTH_INFO = {"ok": True, "team_id": "T1", "team": "Team", "user_id": "UBOT", "user": "bot", "bot_id": "B1"}
+
+
+class FakeDKUSlackClient:
+    """Stands in for DKUSlackClient, whose token test calls Slack."""
+
+    def __init__(self, slack_token):
+        self.auth_info = dict(AUTH_INFO)
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.calls = []
+        self.called = threading.Event()
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args[0]))
+            self.called.set()
+        return record
+
+
+def _no_auth_test(self, **kwargs):
+    raise AssertionError("Bolt called auth.test")
+
+
+def _manager(monkeypatch):
+    monkeypatch.setattr(slack_manager, "DKUSlackClient", FakeDKUSlackClient)
+    monkeypatch.setattr(WebClient, "auth_test", _no_auth_test)
+    manager = SlackManager(BOT_TOKEN, slack_signing_secret=SIGNING_SECRET)
+    manager.event_handler = RecordingHandler()
+    return manager
+
+
+def _dispatch(manager, event):
+    body = json.dumps({
+        "token": "t", "team_id": "T1", "api_app_id": "A1", "type": "event_callback",
+        "event_id": "Ev1", "event_time": 1, "authorizations": [{"team_id": "T1", "user_id": "UBOT", "is_bot": True}],
+        "event": event,
+    })
+    timestamp = str(int(time.time()))
+    signature = SignatureVerifier(SIGNING_SECRET).generate_signature(timestamp=timestamp, body=body)
+    return manager.app.dispatch(BoltRequest(body=body, headers={
+        "content-type": ["application/json"],
+        "x-slack-signature": [signature],
+        "x-slack-request-timestamp": [timestamp],
+    }))
+
+
+def test_requests_are_authorized_with_the_stored_identity(monkeypatch):
+    manager = _manager(monkeypatch)
+    message = {"type": "message", "channel": "D1", "user": "U1", "text": "hello", "ts": "1.000001"}
+    response = _dispatch(manager, message)
+    assert response.status == 200
+    assert manager.event_handler.called.wait(timeout=5)
+    assert manager.event_handler.calls == [("handle_message_event", message)]
+    manager.cleanup()
+
+
+class FakeThreadClient:
+    """Serves the replies of one thread, honoring the oldest bound like conversations.replies."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.oldest_requested = []
+
+    async def fetch_thread_replies(self, channel_id, thread_ts, resolve_users=True, oldest=None):
+        self.oldest_requested.append(oldest)
+        return [
+            dict(message) for message in self.replies
+            if oldest is None or float(message["ts"]) > float(oldest)
+        ], None
+
+
+def test_user_edit_drops_the_thread_buffer(monkeypatch):
+    manager = _manager(monkeypatch)
+    client = FakeThreadClient([{"ts": "101.000000", "user": "U1", "text": "first question"}])
+    handler = SlackEventHandler("UBOT", "bot", slack_client=client, settings={})
+    manager.event_handler = handler
+    loop = handler._get_loop()
+
+    def history():
+        return asyncio.run_coroutine_threadsafe(handler.get_conversation_history(
+            "C1", "100.000000", conversation_context_limit=10, before_ts="102.000000"
+        ), loop).result(timeout=5)
+
+    history()
+    client.replies[0]["text"] = "edited question"
+    response = _dispatch(manager, {
+        "type": "message", "subtype": "message_changed", "channel": "C1", "ts": "103.000000",
+        "message": {"ts": "101.000000", "thread_ts": "100.000000", "user": "U1", "text": "edited question"},
+    })
+    assert response.status == 200
+    # Wait for the listener, then for the handler loop to run the callback it scheduled
+    manager._listener_executor.shutdown(wait=True)
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(timeout=5)
+    assert history() == [{"role": "user", "content": "edited question"}]
+    assert client.oldest_requested == [None, None]
@@ -3,6 +3,7 @@ from utils.logging import logger
 from dkuslackclient.slack_manager import SlackManager
 from flask import Flask, request
 import atexit
+import logging
 
 
 # Global variables
@@ -42,8 +43,9 @@ def setup_flask_for_http_mode():
             logger.error("Slack manager not initialized")
             return "Slack manager not initialized", 500
         
-        for header, value in request.headers.items():
-            logger.debug(f"Header: {header} -> Value: {value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for header, value in request.headers.items():
+                logger.debug("Header: %s -> Value: %s", header, value)
         
         # Process the request using the SlackManager's HTTP request handler
         return slack_manager.handle_http_request(request)
@@ -124,6 +126,50 @@ def init():
         except (ValueError, TypeError):
             logger.warning(f"Invalid conversation_history_days in config: {config.get('conversation_history_days')}. Using default.")
     
+    # Extract message batching window setting
+    if "message_batch_window_ms" in config:
+        try:
+            batch_window_ms = int(config["message_batch_window_ms"])
+            if batch_window_ms >= 0:
+                settings["message_batch_window_ms"] = batch_window_ms
+                logger.info(f"Using message batching window: {batch_window_ms} ms")
+        except (ValueError, TypeError):
+            logger.warn(f"Invalid message_batch_window_ms in config: {config.get('message_batch_window_ms')}. Using default.")
+    
+    # Extract LLM concurrency limit setting
+    if "llm_max_concurrency" in config:
+        try:
+            llm_max_concurrency = int(config["llm_max_concurrency"])
+            if llm_max_concurrency > 0:
+                settings["llm_max_concurrency"] = llm_max_concurrency
+                logger.info(f"Using LLM concurrency limit: {llm_max_concurrency}")
+        except (ValueError, TypeError):
+            logger.warn(f"Invalid llm_max_concurrency in config: {config.get('llm_max_concurrency')}. Using default.")
+    
+    # Extract response streaming setting
+    if "stream_responses" in config:
+        settings["stream_responses"] = bool(config["stream_responses"])
+        logger.info(f"Streaming responses: {settings['stream_responses']}")
+    
+    # Extract response cache settings
+    if config.get("enable_response_cache"):
+        settings["enable_response_cache"] = True
+        try:
+            ttl_minutes = int(config.get("response_cache_ttl_minutes") or 0)
+            if ttl_minutes > 0:
+                settings["response_cache_ttl_minutes"] = ttl_minutes
+        except (ValueError, TypeError):
+            logger.warn(f"Invalid response_cache_ttl_minutes in config: {config.get('response_cache_ttl_minutes')}. Using default.")
+        if config.get("response_cache_embedding_llm_id"):
+            settings["response_cache_embedding_llm_id"] = config["response_cache_embedding_llm_id"]
+            try:
+                threshold = float(config.get("response_cache_similarity_threshold") or 0)
+                if 0 < threshold <= 1:
+                    settings["response_cache_similarity_threshold"] = threshold
+            except (ValueError, TypeError):
+                logger.warn(f"Invalid response_cache_similarity_threshold in config: {config.get('response_cache_similarity_threshold')}. Using default.")
+        logger.info(f"Response cache enabled with embedding model: {settings.get('response_cache_embedding_llm_id') or 'none (exact matches only)'}")
+    
     # Extract custom system prompt if available
     if "custom_system_prompt" in config:
         custom_prompt = config["custom_system_prompt"]